@@ -1,17 +1,26 @@
-from flask import Flask, render_template, request, session, jsonify
+from flask import Flask, Response, g, render_template, request, session, jsonify, stream_with_context
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_wtf import FlaskForm
 from flask_wtf.csrf import CSRFProtect
-from wtforms import TextAreaField, StringField, validators
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from fuzzywuzzy import fuzz
+from wtforms import TextAreaField, StringField, BooleanField, SelectField, validators
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess,
+)
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import atexit
+import cProfile
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
 import time
+import uuid
+import zlib
 import logging
 import json
 import traceback
@@ -19,8 +28,79 @@ import sys
 from datetime import datetime
 import pytz
 
+from w2m.analysis import (
+    SLOT_PAGE_DAYS, SLOT_PAGE_MAX_DAYS, SLOT_PEOPLE_FORMATS, WINDOW_MAX_LIMIT, WindowConstraints,
+    diff_events, event_slot_page, get_participant_data, rank_windows, update_participant_data,
+)
+from w2m.event import (
+    DEFAULT_TIMEZONE, EVENT_NOT_FOUND_ERROR, EventNotFound, get_participant_names,
+    is_event_url, normalize_event_url,
+)
+from w2m.extract import DriverPoolExhausted, fetch_event, make_extractor, make_http_session
+from w2m.matching import compare_names
+from w2m.metrics import CACHE_LOOKUPS, RATE_LIMITED, REQUEST_SECONDS, stage_timings, timed
+from w2m.snapshot import SnapshotError, dump_snapshot, load_snapshot
+
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "your-secret-key-here"  # Change this to a random secret key
+# "http" parses the event page's inline scripts, "selenium" renders it in Firefox
+app.config["EXTRACTOR"] = os.environ.get("W2M_EXTRACTOR", "http")
+# Hosts (and their subdomains) that event links may point at, so requests can't
+# make the server fetch arbitrary URLs
+app.config["EVENT_HOSTS"] = os.environ.get("W2M_EVENT_HOSTS", "when2meet.com").split(",")
+app.config["HTTP_TIMEOUT"] = float(os.environ.get("W2M_HTTP_TIMEOUT", "10"))
+app.config["HTTP_POOL_SIZE"] = int(os.environ.get("W2M_HTTP_POOL_SIZE", "10"))
+# Page fetches in flight to one host per worker, shared by requests, jobs, batches and watches
+app.config["HTTP_PER_HOST"] = int(os.environ.get("W2M_HTTP_PER_HOST", "8"))
+# Selenium driver pool, per gunicorn worker
+app.config["DRIVER_POOL_SIZE"] = int(os.environ.get("W2M_DRIVER_POOL_SIZE", "2"))
+app.config["DRIVER_CHECKOUT_TIMEOUT"] = float(os.environ.get("W2M_DRIVER_CHECKOUT_TIMEOUT", "30"))
+app.config["DRIVER_MAX_USES"] = int(os.environ.get("W2M_DRIVER_MAX_USES", "50"))
+# Waiting for an event's data scales with recent page loads, within these bounds
+app.config["READY_TIMEOUT_MIN"] = float(os.environ.get("W2M_READY_TIMEOUT_MIN", "3"))
+app.config["READY_TIMEOUT_MAX"] = float(os.environ.get("W2M_READY_TIMEOUT_MAX", "15"))
+# Parsed event cache; set W2M_CACHE_PATH to share it between workers through SQLite
+app.config["CACHE_TTL"] = float(os.environ.get("W2M_CACHE_TTL", "300"))
+app.config["CACHE_MAX_ENTRIES"] = int(os.environ.get("W2M_CACHE_MAX_ENTRIES", "256"))
+app.config["CACHE_PATH"] = os.environ.get("W2M_CACHE_PATH", "")
+# Largest request body accepted, uploaded snapshots included
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("W2M_MAX_CONTENT_LENGTH", "1048576"))
+# Expired snapshots are kept this long to diff against on the next check
+app.config["SNAPSHOT_RETENTION"] = float(os.environ.get("W2M_SNAPSHOT_RETENTION", "86400"))
+# Background checks submitted through /jobs
+app.config["JOB_DB_PATH"] = os.environ.get(
+    "W2M_JOB_DB_PATH", os.path.join(tempfile.gettempdir(), "when2meet-jobs.db")
+)
+app.config["JOB_WORKERS"] = int(os.environ.get("W2M_JOB_WORKERS", "4"))
+app.config["JOB_MAX_PENDING"] = int(os.environ.get("W2M_JOB_MAX_PENDING", "32"))
+app.config["JOB_TIMEOUT"] = float(os.environ.get("W2M_JOB_TIMEOUT", "120"))
+app.config["JOB_RETENTION"] = float(os.environ.get("W2M_JOB_RETENTION", "3600"))
+# Each browser's past checks, so they can be reopened without scraping again
+app.config["HISTORY_DB_PATH"] = os.environ.get(
+    "W2M_HISTORY_DB_PATH", os.path.join(tempfile.gettempdir(), "when2meet-history.db")
+)
+app.config["HISTORY_RETENTION"] = float(os.environ.get("W2M_HISTORY_RETENTION", "2592000"))
+app.config["HISTORY_MAX_PER_USER"] = int(os.environ.get("W2M_HISTORY_MAX_PER_USER", "20"))
+# Watched events are re-checked in the background, backing off while nothing changes
+app.config["WATCH_POLLER"] = os.environ.get("W2M_WATCH_POLLER", "1") == "1"
+app.config["WATCH_DB_PATH"] = os.environ.get(
+    "W2M_WATCH_DB_PATH", os.path.join(tempfile.gettempdir(), "when2meet-watches.db")
+)
+app.config["WATCH_MIN_INTERVAL"] = float(os.environ.get("W2M_WATCH_MIN_INTERVAL", "60"))
+app.config["WATCH_MAX_INTERVAL"] = float(os.environ.get("W2M_WATCH_MAX_INTERVAL", "3600"))
+app.config["WATCH_TTL"] = float(os.environ.get("W2M_WATCH_TTL", "604800"))
+app.config["WATCH_MAX_ACTIVE"] = int(os.environ.get("W2M_WATCH_MAX_ACTIVE", "1000"))
+app.config["WATCH_CONCURRENCY"] = int(os.environ.get("W2M_WATCH_CONCURRENCY", "4"))
+app.config["WATCH_WEBHOOK_HOSTS"] = os.environ.get(
+    "W2M_WATCH_WEBHOOK_HOSTS", "localhost,127.0.0.1"
+).split(",")
+# /batch fan-out, shared by all batch requests in a worker
+app.config["BATCH_CONCURRENCY"] = int(os.environ.get("W2M_BATCH_CONCURRENCY", "8"))
+app.config["BATCH_MAX_URLS"] = int(os.environ.get("W2M_BATCH_MAX_URLS", "50"))
+# Requests slower than this log their stage timings (0 disables); set W2M_PROFILE_DIR
+# as well to also dump a cProfile of each one
+app.config["SLOW_REQUEST_SECONDS"] = float(os.environ.get("W2M_SLOW_REQUEST_SECONDS", "0"))
+app.config["PROFILE_DIR"] = os.environ.get("W2M_PROFILE_DIR", "")
 csrf = CSRFProtect(app)
 limiter = Limiter(app, key_func=get_remote_address)
 
@@ -35,119 +115,984 @@ class ComparisonForm(FlaskForm):
     when2meet_url = StringField(
         "When2Meet URL", validators=[validators.DataRequired(), validators.URL()]
     )
+    force_refresh = BooleanField("Fetch fresh data")
+    one_to_one = BooleanField("Match each When2Meet name to at most one person")
+    timezone = SelectField(
+        "Time zone",
+        choices=[(name, name) for name in pytz.common_timezones],
+        default=DEFAULT_TIMEZONE,
+    )
 
+    def validate_when2meet_url(self, field):
+        if not is_allowed_event_url(field.data):
+            raise validators.ValidationError("Enter a When2Meet event link.")
 
-def get_participant_names(url):
-    options = Options()
-    options.add_argument("-headless")
-    logging.info("Starting Firefox in headless mode")
-    driver = webdriver.Firefox(options=options)
 
-    try:
-        logging.info(f"Navigating to URL: {url}")
-        driver.get(url)
-        logging.info("Waiting for page to load")
+_http_session = None
 
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
 
-        logging.info(f"Page title: {driver.title}")
-        logging.info(f"Page URL: {driver.current_url}")
-
-        # Modified JavaScript to properly extract data
-        script = """
-        var result = {
-            PeopleNames: [],
-            PeopleIDs: [],
-            AvailableAtSlot: [],
-            TimeZone: ''
-        };
-
-        // Debug logging
-        console.log('Window variables:', {
-            hasPeopleNames: typeof window.PeopleNames !== 'undefined',
-            hasPeopleIDs: typeof window.PeopleIDs !== 'undefined',
-            hasAvailableAtSlot: typeof window.AvailableAtSlot !== 'undefined'
-        });
-
-        // Properly assign window variables to result
-        if (typeof window.PeopleNames !== 'undefined') {
-            result.PeopleNames = window.PeopleNames;
+def get_http_session():
+    # One pooled session per worker so keep-alive connections are reused
+    global _http_session
+    if _http_session is None:
+        _http_session = make_http_session(app.config["HTTP_POOL_SIZE"])
+    return _http_session
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor():
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            if app.config["EXTRACTOR"] == "selenium":
+                _extractor = make_extractor(
+                    "selenium",
+                    pool_size=app.config["DRIVER_POOL_SIZE"],
+                    checkout_timeout=app.config["DRIVER_CHECKOUT_TIMEOUT"],
+                    max_uses=app.config["DRIVER_MAX_USES"],
+                    ready_timeout_min=app.config["READY_TIMEOUT_MIN"],
+                    ready_timeout_max=app.config["READY_TIMEOUT_MAX"],
+                )
+                atexit.register(_extractor.close)
+            else:
+                _extractor = make_extractor(
+                    "http", timeout=app.config["HTTP_TIMEOUT"], session=get_http_session(),
+                    per_host=app.config["HTTP_PER_HOST"],
+                )
+    return _extractor
+
+
+def extract_event(url, deadline=None):
+    # A deadline (a time.time() value) caps how long the extractor may wait
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            raise TimeoutError(f"No time left to fetch {url}")
+    return fetch_event(url, get_extractor(), timeout=timeout)
+
+
+class MemoryEventCache:
+    """Per-worker TTL cache with least-recently-used eviction."""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if age > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, age
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteEventCache:
+    """TTL + LRU cache in a SQLite file so every gunicorn worker shares entries.
+
+    Events are stored as binary snapshots and analyses as compressed JSON.
+    """
+
+    def __init__(self, path, ttl, max_entries):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS event_snapshots ("
+                "key TEXT PRIMARY KEY, stored_at REAL, accessed_at REAL, snapshot BLOB, "
+                "analysis BLOB)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS event_snapshots_accessed "
+                "ON event_snapshots (accessed_at)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT stored_at, snapshot, analysis FROM event_snapshots WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            stored_at, snapshot, analysis = row
+            if now - stored_at > self.ttl:
+                db.execute("DELETE FROM event_snapshots WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE event_snapshots SET accessed_at = ? WHERE key = ?", (now, key))
+        entry = {
+            "event": load_snapshot(snapshot),
+            "analysis": json.loads(zlib.decompress(analysis)),
         }
-        if (typeof window.PeopleIDs !== 'undefined') {
-            result.PeopleIDs = window.PeopleIDs;
+        return entry, now - stored_at
+
+    def set(self, key, value):
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO event_snapshots VALUES (?, ?, ?, ?, ?)",
+                (key, now, now, dump_snapshot(value["event"]),
+                 zlib.compress(json.dumps(value["analysis"]).encode())),
+            )
+            db.execute("DELETE FROM event_snapshots WHERE stored_at < ?", (now - self.ttl,))
+            db.execute(
+                "DELETE FROM event_snapshots WHERE key NOT IN "
+                "(SELECT key FROM event_snapshots ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+
+_event_cache = None
+
+
+def get_event_cache():
+    # Entries live for the retention period; load_event decides when they are fresh
+    global _event_cache
+    if _event_cache is None:
+        retention = max(app.config["CACHE_TTL"], app.config["SNAPSHOT_RETENTION"])
+        if app.config["CACHE_PATH"]:
+            _event_cache = SQLiteEventCache(
+                app.config["CACHE_PATH"], retention, app.config["CACHE_MAX_ENTRIES"]
+            )
+        else:
+            _event_cache = MemoryEventCache(retention, app.config["CACHE_MAX_ENTRIES"])
+    return _event_cache
+
+
+def load_event(url, force_refresh=False, progress=None, timezone=DEFAULT_TIMEZONE,
+               deadline=None):
+    """Return (event, analysis, cache_status), scraping only on a cache miss.
+
+    Cached snapshots older than the TTL are kept around so a refresh can report
+    what changed since the last check, and skip the analysis if nothing did.
+    Raises TimeoutError if `deadline` passes before the event is fetched.
+    """
+    progress = progress or (lambda stage: None)
+    key = normalize_event_url(url)
+    cache = get_event_cache()
+
+    cached = cache.get(key)
+    if cached and not force_refresh and cached[1] <= app.config["CACHE_TTL"]:
+        CACHE_LOOKUPS.labels("hit").inc()
+        entry, age = cached
+        logging.info(f"Cache hit for {key} ({age:.0f}s old)")
+        analysis = entry["analysis"]
+        if analysis.get("timezone") != timezone:
+            # The snapshot is zone independent; only the labels need redoing
+            with timed("analysis"):
+                analysis = get_participant_data(entry["event"], timezone)
+        return entry["event"], analysis, {"hit": True, "age_seconds": age}
+    CACHE_LOOKUPS.labels("bypass" if cached and force_refresh else "stale" if cached else "miss").inc()
+
+    progress("fetching")
+    event = extract_event(url, deadline)
+    if not event:
+        return None, None, {"hit": False, "age_seconds": 0}
+    progress("parsed")
+
+    cache_status = {"hit": False, "age_seconds": 0}
+    if cached:
+        previous, previous_age = cached
+        with timed("analysis"):
+            changes = diff_events(previous["event"], event)
+            analysis = update_participant_data(previous["analysis"], changes, event, timezone)
+        cache_status["changes"] = dict(changes, since_seconds=previous_age)
+    else:
+        with timed("analysis"):
+            analysis = get_participant_data(event, timezone)
+    progress("analyzed")
+
+    if analysis:
+        cache.set(key, {"event": event, "analysis": analysis})
+    return event, analysis, cache_status
+
+
+def get_event_snapshot(url, timezone=DEFAULT_TIMEZONE):
+    """Return the last fetched snapshot of an event, even past the TTL, fetching only if none.
+
+    Only for follow-up requests from a results page, such as the heatmap, so they
+    see the data the page was built from. Anything else should call load_event.
+    """
+    cached = get_event_cache().get(normalize_event_url(url))
+    if cached:
+        return cached[0]["event"]
+    return load_event(url, timezone=timezone)[0]
+
+
+def run_check(names_list, when2meet_url, force_refresh=False, one_to_one=False,
+              timezone=DEFAULT_TIMEZONE, progress=None, deadline=None):
+    """Compare a roster against an event and return the results template context."""
+    event, analysis, cache_status = load_event(
+        when2meet_url, force_refresh=force_refresh, progress=progress, timezone=timezone,
+        deadline=deadline,
+    )
+    return build_check_result(names_list, event, analysis, cache_status, one_to_one)
+
+
+def build_check_result(names_list, event, analysis, cache_status, one_to_one=False):
+    with timed("matching"):
+        participant_names = get_participant_names(event) if event else []
+        comparison, missing_names, match_details = compare_names(
+            names_list, participant_names, one_to_one=one_to_one
+        )
+
+    if not analysis:
+        return {
+            'comparison': comparison,
+            'missing_names': missing_names,
+            'match_details': match_details,
+            'error': "Could not extract time slots from When2Meet."
         }
-        if (typeof window.AvailableAtSlot !== 'undefined') {
-            result.AvailableAtSlot = window.AvailableAtSlot;
+
+    return {
+        'comparison': comparison,
+        'missing_names': missing_names,
+        'match_details': match_details,
+        'cache_status': cache_status,
+        'changes': cache_status.get('changes'),
+        # The page fetches slots from /events/slots instead of inlining them
+        'event_url': event.url,
+        'best_slots': analysis.get('best_slots', []),
+        'continuous_slots': analysis.get('continuous_slots', {}),
+        'timezone': analysis.get('timezone', DEFAULT_TIMEZONE),
+        'timezone_abbr': analysis.get('timezone_abbr', ''),
+        'availability_stats': {
+            'total_slots': analysis.get('total_slots', 0),
+            'max_availability': analysis.get('max_availability', 0),
+            'avg_availability': analysis.get('avg_availability', 0)
         }
+    }
+
+
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+
+def get_batch_executor():
+    # Shared across requests so concurrent batches can't multiply the fan-out
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(
+                max_workers=app.config["BATCH_CONCURRENCY"], thread_name_prefix="batch"
+            )
+    return _batch_executor
+
+
+def run_batch(entries, force_refresh=False, one_to_one=False, timezone=DEFAULT_TIMEZONE):
+    """Check (url, names_list) pairs, fetching each distinct event once and concurrently."""
+    urls_by_key = {}
+    for url, _ in entries:
+        urls_by_key.setdefault(normalize_event_url(url), url)
+
+    futures = {
+        key: get_batch_executor().submit(load_event, url, force_refresh, timezone=timezone)
+        for key, url in urls_by_key.items()
+    }
+
+    results = []
+    for url, names_list in entries:
+        item = {"url": url}
+        try:
+            event, analysis, cache_status = futures[normalize_event_url(url)].result()
+            result = build_check_result(names_list, event, analysis, cache_status, one_to_one)
+        except EventNotFound:
+            item.update(status="error", error=EVENT_NOT_FOUND_ERROR)
+            results.append(item)
+            continue
+        except Exception as e:
+            logging.error(f"Batch check failed for {url}: {str(e)}")
+            item.update(status="error", error="An error occurred while processing this event.")
+            results.append(item)
+            continue
+
+        result.pop("event_url", None)
+        item.update(result)
+        item["status"] = "error" if "error" in result else "ok"
+        results.append(item)
+    return results
+
+
+JOB_TERMINAL_STATUSES = ("done", "failed")
+JOB_TIMEOUT_ERROR = "The check timed out."
+# Server-sent event streams end after this long so they don't pin a worker;
+# EventSource reconnects on its own
+STREAM_SECONDS = 30
+
 
-        // Get timezone
-        var tzSelect = document.getElementById('ParticipantTimeZone');
-        if (tzSelect) {
-            result.TimeZone = tzSelect.options[tzSelect.selectedIndex].text;
+class JobQueueFull(Exception):
+    pass
+
+
+class JobStore:
+    """Job status and results in SQLite, so any worker can answer a poll."""
+
+    def __init__(self, path, retention):
+        self.path = path
+        self.retention = retention
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT, stage TEXT, created_at REAL, "
+                "updated_at REAL, deadline REAL, result BLOB, error TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def create(self, timeout):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            db.execute("DELETE FROM jobs WHERE created_at < ?", (now - self.retention,))
+            db.execute(
+                "INSERT INTO jobs (id, status, stage, created_at, updated_at, deadline) "
+                "VALUES (?, 'queued', 'queued', ?, ?, ?)",
+                (job_id, now, now, now + timeout),
+            )
+        return job_id
+
+    def update(self, job_id, status="running", stage=None, result=None, error=None):
+        # Never overwrite a job that already finished or timed out
+        payload = zlib.compress(json.dumps(result).encode()) if result is not None else None
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, stage = COALESCE(?, stage), updated_at = ?, "
+                "result = COALESCE(?, result), error = COALESCE(?, error) "
+                "WHERE id = ? AND status NOT IN (?, ?)",
+                (status, stage, time.time(), payload, error, job_id) + JOB_TERMINAL_STATUSES,
+            )
+
+    def get(self, job_id):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT status, stage, created_at, updated_at, deadline, result, error "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, stage, created_at, updated_at, deadline, result, error = row
+        if status not in JOB_TERMINAL_STATUSES and time.time() > deadline:
+            self.update(job_id, status="failed", error=JOB_TIMEOUT_ERROR)
+            return self.get(job_id)
+        return {
+            "id": job_id,
+            "status": status,
+            "stage": stage,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "result": json.loads(zlib.decompress(result)) if result else None,
+            "error": error,
         }
 
-        // Debug logging
-        console.log('Extracted data:', result);
-        
-        return JSON.stringify(result);
+
+class JobRunner:
+    """Runs checks on a bounded thread pool, rejecting work beyond the queue limit."""
+
+    def __init__(self, store, max_workers, max_pending, timeout):
+        self.store = store
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, names_list, when2meet_url, force_refresh=False, one_to_one=False,
+               timezone=DEFAULT_TIMEZONE, history_user=None):
+        if not self._pending.acquire(blocking=False):
+            raise JobQueueFull("Too many checks are already queued")
+        deadline = time.time() + self.timeout
+        job_id = self.store.create(self.timeout)
+        self._executor.submit(
+            self._run, job_id, names_list, when2meet_url, force_refresh, one_to_one, timezone,
+            history_user, deadline,
+        )
+        return job_id
+
+    def _run(self, job_id, names_list, when2meet_url, force_refresh, one_to_one, timezone,
+             history_user=None, deadline=None):
+        try:
+            self.store.update(job_id, stage="started")
+            # The fetch gets only the time left, so a slow page can't outlive the job
+            result = run_check(
+                names_list,
+                when2meet_url,
+                force_refresh=force_refresh,
+                one_to_one=one_to_one,
+                timezone=timezone,
+                progress=lambda stage: self.store.update(job_id, stage=stage),
+                deadline=deadline,
+            )
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError(f"Job {job_id} finished after its deadline")
+            self.store.update(job_id, status="done", stage="done", result=result)
+            if history_user:
+                save_history(history_user, names_list, when2meet_url, force_refresh,
+                             one_to_one, timezone, result)
+        except EventNotFound:
+            self.store.update(job_id, status="failed", error=EVENT_NOT_FOUND_ERROR)
+        except TimeoutError as e:
+            logging.warning(f"Job {job_id} timed out: {str(e)}")
+            self.store.update(job_id, status="failed", error=JOB_TIMEOUT_ERROR)
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {str(e)}")
+            logging.error(traceback.format_exc())
+            error = "The server is busy right now." if isinstance(e, DriverPoolExhausted) \
+                else "An error occurred while processing your request."
+            self.store.update(job_id, status="failed", error=error)
+        finally:
+            self._pending.release()
+
+
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            _job_runner = JobRunner(
+                JobStore(app.config["JOB_DB_PATH"], app.config["JOB_RETENTION"]),
+                max_workers=app.config["JOB_WORKERS"],
+                max_pending=app.config["JOB_MAX_PENDING"],
+                timeout=app.config["JOB_TIMEOUT"],
+            )
+    return _job_runner
+
+
+class HistoryStore:
+    """Past checks in SQLite, keyed by user and timestamp, with compressed payloads.
+
+    Users are anonymous: the key is a random ID kept in their session cookie.
+    """
+
+    def __init__(self, path, retention, max_per_user):
+        self.path = path
+        self.retention = retention
+        self.max_per_user = max_per_user
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "user_id TEXT, timestamp INTEGER, when2meet_url TEXT, names_count INTEGER, "
+                "payload BLOB, snapshot BLOB, PRIMARY KEY (user_id, timestamp))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _cutoff(self):
+        return int((time.time() - self.retention) * 1000)
+
+    def add(self, user_id, inputs, result, snapshot=None):
+        """Store a check and return its timestamp (milliseconds since the epoch).
+
+        `snapshot` is the event as a binary snapshot, so the reopened check can
+        show slot data without fetching the event again.
         """
-        
-        # Execute script and get result
-        result = json.loads(driver.execute_script(script))
-        
-        logging.info("Raw data from When2Meet:")
-        logging.info(f"People Names: {result['PeopleNames']}")
-        logging.info(f"People IDs: {result['PeopleIDs']}")
-        logging.info(f"Number of availability slots: {len(result['AvailableAtSlot'])}")
-        logging.info(f"Timezone: {result['TimeZone']}")
-
-        # Create a set of IDs for people who have specified availability
-        available_ids = set()
-        for slot in result["AvailableAtSlot"]:
-            available_ids.update(slot)
-
-        # Filter out names of people who haven't specified any availability
-        participant_names = [
-            name for name, id in zip(result["PeopleNames"], result["PeopleIDs"]) 
-            if id in available_ids
+        timestamp = int(time.time() * 1000)
+        payload = zlib.compress(json.dumps({"inputs": inputs, "result": result}).encode())
+        with self._connect() as db:
+            db.execute("DELETE FROM history WHERE timestamp < ?", (self._cutoff(),))
+            db.execute(
+                "INSERT OR REPLACE INTO history "
+                "(user_id, timestamp, when2meet_url, names_count, payload, snapshot) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, timestamp, inputs["when2meet_url"],
+                 len(inputs["names_list"].splitlines()), payload, snapshot),
+            )
+            db.execute(
+                "DELETE FROM history WHERE user_id = ? AND timestamp NOT IN "
+                "(SELECT timestamp FROM history WHERE user_id = ? "
+                "ORDER BY timestamp DESC LIMIT ?)",
+                (user_id, user_id, self.max_per_user),
+            )
+        return timestamp
+
+    def recent(self, user_id):
+        # Only the summary columns, so listing never decompresses a payload
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT timestamp, when2meet_url, names_count FROM history "
+                "WHERE user_id = ? AND timestamp >= ? ORDER BY timestamp DESC",
+                (user_id, self._cutoff()),
+            ).fetchall()
+        return [
+            {
+                "timestamp": timestamp,
+                "created_at": datetime.utcfromtimestamp(timestamp / 1000).strftime(
+                    "%Y-%m-%d %H:%M UTC"
+                ),
+                "when2meet_url": when2meet_url,
+                "names_count": names_count,
+            }
+            for timestamp, when2meet_url, names_count in rows
         ]
 
-        logging.info(f"Extracted {len(participant_names)} participant names with availability")
-        logging.info(f"Participant names: {participant_names}")
+    def get(self, user_id, timestamp):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT payload FROM history WHERE user_id = ? AND timestamp = ? AND timestamp >= ?",
+                (user_id, timestamp, self._cutoff()),
+            ).fetchone()
+        if row is None:
+            return None
+        entry = json.loads(zlib.decompress(row[0]))
+        return dict(entry["inputs"], timestamp=timestamp, result=entry["result"])
+
+    def get_snapshot(self, user_id, timestamp):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT snapshot FROM history WHERE user_id = ? AND timestamp = ? AND timestamp >= ?",
+                (user_id, timestamp, self._cutoff()),
+            ).fetchone()
+        return load_snapshot(row[0]) if row and row[0] else None
+
+
+_history_store = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store():
+    global _history_store
+    with _history_store_lock:
+        if _history_store is None:
+            _history_store = HistoryStore(
+                app.config["HISTORY_DB_PATH"],
+                app.config["HISTORY_RETENTION"],
+                app.config["HISTORY_MAX_PER_USER"],
+            )
+    return _history_store
+
+
+def get_history_user(create=False):
+    # Only this random ID goes in the cookie; the history itself stays on the server
+    user_id = session.get("history_id")
+    if user_id is None and create:
+        user_id = session["history_id"] = uuid.uuid4().hex
+    return user_id
+
+
+def save_history(user_id, names_list, when2meet_url, force_refresh, one_to_one, timezone,
+                 result):
+    if "error" in result:
+        return
+    inputs = {
+        "names_list": "\n".join(names_list),
+        "when2meet_url": when2meet_url,
+        "force_refresh": force_refresh,
+        "one_to_one": one_to_one,
+        "timezone": timezone,
+    }
+    try:
+        # The check just ran, so its event is in the cache
+        cached = get_event_cache().get(normalize_event_url(when2meet_url))
+        snapshot = dump_snapshot(cached[0]["event"]) if cached else None
+        get_history_store().add(user_id, inputs, result, snapshot)
+    except Exception as e:
+        # A check that worked shouldn't fail because it couldn't be saved
+        logging.error(f"Could not save history: {str(e)}")
+
 
-        # Add this after the initial page load wait
-        WebDriverWait(driver, 20).until(
-            lambda d: d.execute_script(
-                "return typeof window.PeopleNames !== 'undefined' && "
-                "typeof window.PeopleIDs !== 'undefined' && "
-                "typeof window.AvailableAtSlot !== 'undefined'"
+class WatchLimitReached(Exception):
+    pass
+
+
+class WatchStore:
+    """Watches, their per-URL poll schedule and change notifications in SQLite.
+
+    Watches on the same event share one row in watch_polls, so the event is
+    fetched once however many rosters track it. A worker claims a due URL by
+    pushing its next_poll_at forward, so workers never poll the same URL twice.
+    Each URL also keeps a fingerprint of the snapshot its last poll saw.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS watches ("
+                "id TEXT PRIMARY KEY, url_key TEXT, url TEXT, names TEXT, one_to_one INTEGER, "
+                "timezone TEXT, webhook TEXT, created_at REAL, expires_at REAL, "
+                "state BLOB, state_updated_at REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS watches_url ON watches (url_key)")
+            db.execute("CREATE INDEX IF NOT EXISTS watches_expires ON watches (expires_at)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS watch_polls ("
+                "url_key TEXT PRIMARY KEY, url TEXT, interval REAL, next_poll_at REAL, "
+                "last_polled_at REAL, fingerprint TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS watch_polls_due ON watch_polls (next_poll_at)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS watch_events ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, watch_id TEXT, created_at REAL, "
+                "payload TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS watch_events_watch ON watch_events (watch_id, seq)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def create(self, url, names, one_to_one, timezone, webhook, ttl, min_interval, max_active):
+        watch_id = uuid.uuid4().hex
+        key = normalize_event_url(url)
+        now = time.time()
+        with self._connect() as db:
+            (active,) = db.execute("SELECT COUNT(*) FROM watches WHERE expires_at >= ?", (now,)).fetchone()
+            if active >= max_active:
+                raise WatchLimitReached(f"{active} watches are already active")
+            db.execute(
+                "INSERT INTO watches (id, url_key, url, names, one_to_one, timezone, webhook, "
+                "created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (watch_id, key, url, json.dumps(names), int(one_to_one), timezone, webhook,
+                 now, now + ttl),
             )
+            # A new watch is checked right away, even if the URL was backing off
+            db.execute(
+                "INSERT INTO watch_polls VALUES (?, ?, ?, ?, NULL, NULL) ON CONFLICT (url_key) "
+                "DO UPDATE SET interval = excluded.interval, next_poll_at = excluded.next_poll_at",
+                (key, url, min_interval, now),
+            )
+        return watch_id
+
+    def delete(self, watch_id):
+        with self._connect() as db:
+            deleted = db.execute("DELETE FROM watches WHERE id = ?", (watch_id,)).rowcount
+            db.execute("DELETE FROM watch_events WHERE watch_id = ?", (watch_id,))
+            self._drop_unwatched(db)
+        return bool(deleted)
+
+    def _drop_unwatched(self, db):
+        db.execute(
+            "DELETE FROM watch_polls WHERE url_key NOT IN (SELECT url_key FROM watches)"
         )
 
-        return participant_names
+    def expire(self):
+        now = time.time()
+        with self._connect() as db:
+            expired = [row[0] for row in db.execute(
+                "SELECT id FROM watches WHERE expires_at < ?", (now,)
+            )]
+            if expired:
+                db.executemany("DELETE FROM watches WHERE id = ?", [(i,) for i in expired])
+                db.executemany("DELETE FROM watch_events WHERE watch_id = ?", [(i,) for i in expired])
+                self._drop_unwatched(db)
+        return len(expired)
+
+    def claim_due(self, lease, limit):
+        """Return (url_key, url, interval, fingerprint) for due URLs this worker now owns.
+
+        Claims last `lease` seconds.
+        """
+        now = time.time()
+        claimed = []
+        with self._connect() as db:
+            due = db.execute(
+                "SELECT url_key, url, interval, fingerprint FROM watch_polls WHERE next_poll_at <= ? "
+                "ORDER BY next_poll_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            for url_key, url, interval, fingerprint in due:
+                updated = db.execute(
+                    "UPDATE watch_polls SET next_poll_at = ? WHERE url_key = ? AND next_poll_at <= ?",
+                    (now + lease, url_key, now),
+                ).rowcount
+                if updated:
+                    claimed.append((url_key, url, interval, fingerprint))
+        return claimed
+
+    def reschedule(self, url_key, interval, fingerprint=None):
+        # A poll that fetched nothing keeps the fingerprint it had
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "UPDATE watch_polls SET interval = ?, next_poll_at = ?, last_polled_at = ?, "
+                "fingerprint = COALESCE(?, fingerprint) WHERE url_key = ?",
+                (interval, now + interval, now, fingerprint, url_key),
+            )
+
+    def watches_for(self, url_key):
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id, names, one_to_one, timezone, webhook, state FROM watches "
+                "WHERE url_key = ? AND expires_at >= ?",
+                (url_key, time.time()),
+            ).fetchall()
+        return [
+            {
+                "id": watch_id,
+                "names": json.loads(names),
+                "one_to_one": bool(one_to_one),
+                "timezone": timezone,
+                "webhook": webhook,
+                "state": json.loads(zlib.decompress(state)) if state else None,
+            }
+            for watch_id, names, one_to_one, timezone, webhook, state in rows
+        ]
+
+    def record_change(self, watch_id, state, event=None):
+        """Store a watch's new state, plus a notification when `event` is given."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "UPDATE watches SET state = ?, state_updated_at = ? WHERE id = ?",
+                (zlib.compress(json.dumps(state).encode()), now, watch_id),
+            )
+            if event is not None:
+                db.execute(
+                    "INSERT INTO watch_events (watch_id, created_at, payload) VALUES (?, ?, ?)",
+                    (watch_id, now, json.dumps(event)),
+                )
+
+    def get(self, watch_id):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT w.url, w.names, w.one_to_one, w.timezone, w.webhook, w.created_at, "
+                "w.expires_at, w.state, w.state_updated_at, p.interval, p.next_poll_at, "
+                "p.last_polled_at FROM watches w LEFT JOIN watch_polls p ON p.url_key = w.url_key "
+                "WHERE w.id = ? AND w.expires_at >= ?",
+                (watch_id, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        (url, names, one_to_one, timezone, webhook, created_at, expires_at, state,
+         state_updated_at, interval, next_poll_at, last_polled_at) = row
+        return {
+            "id": watch_id,
+            "url": url,
+            "names": json.loads(names),
+            "one_to_one": bool(one_to_one),
+            "timezone": timezone,
+            "webhook": webhook,
+            "created_at": created_at,
+            "expires_at": expires_at,
+            "state": json.loads(zlib.decompress(state)) if state else None,
+            "state_updated_at": state_updated_at,
+            "interval": interval,
+            "next_poll_at": next_poll_at,
+            "last_polled_at": last_polled_at,
+        }
+
+    def events_since(self, watch_id, seq=0):
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT seq, payload FROM watch_events WHERE watch_id = ? AND seq > ? ORDER BY seq",
+                (watch_id, seq),
+            ).fetchall()
+        return [(row_seq, json.loads(payload)) for row_seq, payload in rows]
+
+
+class WatchScheduler:
+    """Background poller for watched events, one per worker."""
+
+    def __init__(self, store, min_interval, max_interval, concurrency, tick=5):
+        self.store = store
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.concurrency = concurrency
+        self.tick = tick
+        # A claim lapses after this long, so a crashed worker's URLs are picked up again
+        self.lease = max(300, app.config["JOB_TIMEOUT"])
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="watch")
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="watch-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_due()
+            except Exception as e:
+                logging.error(f"Watch poll failed: {str(e)}")
+                logging.error(traceback.format_exc())
+            self._stop.wait(self.tick)
+
+    def run_due(self):
+        self.store.expire()
+        claimed = self.store.claim_due(self.lease, limit=self.concurrency * 2)
+        # Wait for the batch, so this worker never holds more claims than it can poll
+        for future in [self._executor.submit(self.poll, *claim) for claim in claimed]:
+            future.result()
+
+    def poll(self, url_key, url, interval, fingerprint=None):
+        watches = self.store.watches_for(url_key)
+        if not watches:
+            return
+        try:
+            event = load_event(url, force_refresh=True)[0]
+        except EventNotFound:
+            for watch in watches:
+                self._update(watch, url, {"error": EVENT_NOT_FOUND_ERROR})
+            self.store.reschedule(url_key, self.max_interval)
+            return
+        except Exception as e:
+            logging.error(f"Could not poll watched event {url}: {str(e)}")
+            event = None
+        if event is None:
+            self.store.reschedule(url_key, min(interval * 2, self.max_interval))
+            return
+
+        # Compared with what this URL's last poll saw, not the shared cache, which
+        # every other check of the event refreshes too
+        new_fingerprint = hashlib.sha256(dump_snapshot(event)).hexdigest()
+        changed = new_fingerprint != fingerprint
+        participant_names = get_participant_names(event)
+        for watch in watches:
+            # Unchanged events only need evaluating for watches that have never been checked
+            if changed or watch["state"] is None:
+                self._update(watch, url, watch_state(watch, event, participant_names))
+
+        # Back off while nothing happens, and poll quickly again as soon as something does
+        self.store.reschedule(
+            url_key, self.min_interval if changed else min(interval * 2, self.max_interval),
+            new_fingerprint,
+        )
+
+    def _update(self, watch, url, state):
+        previous = watch["state"] or {}
+        if state == previous:
+            return
+        reasons = []
+        if "error" in state and "error" not in previous:
+            reasons.append("not_found")
+        if "error" not in state:
+            was_complete = bool(previous) and not previous.get("error") \
+                and not previous["missing_names"]
+            if not state["missing_names"] and not was_complete:
+                reasons.append("complete")
+            if state["best_window"] != previous.get("best_window"):
+                reasons.append("best_window_changed")
+
+        event = dict(state, watch_id=watch["id"], url=url, reasons=reasons) if reasons else None
+        self.store.record_change(watch["id"], state, event)
+        if event and watch["webhook"]:
+            notify_webhook(watch["webhook"], event)
+
+
+def watch_state(watch, event, participant_names):
+    _, missing_names, _ = compare_names(watch["names"], participant_names, watch["one_to_one"])
+    best = rank_windows(event, WindowConstraints(), watch["timezone"], limit=1)
+    return {
+        "missing_names": missing_names,
+        "respondents": len(participant_names),
+        "best_window": best[0] if best else None,
+    }
+
+
+def is_allowed_event_url(url):
+    return is_event_url(url, app.config["EVENT_HOSTS"])
+
+
+def is_known_timezone(name):
+    # JSON bodies can hold any type, and lists or objects aren't hashable
+    return isinstance(name, str) and name in pytz.all_timezones_set
+
+
+def is_allowed_webhook(url):
+    # Only hosts on the allowlist, so watches can't make the server call arbitrary URLs
+    parts = urlsplit(url) if isinstance(url, str) else None
+    return bool(
+        parts and parts.scheme in ("http", "https")
+        and parts.hostname in app.config["WATCH_WEBHOOK_HOSTS"]
+    )
+
+
+def notify_webhook(url, payload):
+    try:
+        response = get_http_session().post(url, json=payload, timeout=app.config["HTTP_TIMEOUT"])
+        response.raise_for_status()
     except Exception as e:
-        logging.error(f"An error occurred: {str(e)}")
-        logging.error(f"Traceback: {traceback.format_exc()}")
-        return []
-    finally:
-        logging.info("Closing the browser")
-        driver.quit()
+        logging.warning(f"Webhook {url} failed: {str(e)}")
+
+
+_watch_scheduler = None
+_watch_scheduler_lock = threading.Lock()
 
 
-def find_best_match(name, participant_names, threshold=90):
-    best_match = None
-    best_ratio = 0
-    for participant in participant_names:
-        ratio = fuzz.ratio(name.lower(), participant.lower())
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_match = participant
+def get_watch_scheduler():
+    global _watch_scheduler
+    with _watch_scheduler_lock:
+        if _watch_scheduler is None:
+            _watch_scheduler = WatchScheduler(
+                WatchStore(app.config["WATCH_DB_PATH"]),
+                min_interval=app.config["WATCH_MIN_INTERVAL"],
+                max_interval=app.config["WATCH_MAX_INTERVAL"],
+                concurrency=app.config["WATCH_CONCURRENCY"],
+            )
+            atexit.register(_watch_scheduler.stop)
+    return _watch_scheduler
+
 
-    if best_ratio >= threshold:
-        return best_match
-    return None
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    stage_timings.current = []
+    if app.config["PROFILE_DIR"] and app.config["SLOW_REQUEST_SECONDS"] > 0:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+@app.after_request
+def record_request_time(response):
+    # Requests rejected by the rate limiter never reach start_request_timer
+    if "request_started" not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.endpoint or "unknown"
+    REQUEST_SECONDS.labels(endpoint, request.method).observe(elapsed)
+    timings, stage_timings.current = stage_timings.current, None
+
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+    threshold = app.config["SLOW_REQUEST_SECONDS"]
+    if threshold > 0 and elapsed >= threshold:
+        stages = ", ".join(f"{stage}={seconds:.3f}s" for stage, seconds in timings)
+        logging.warning(f"Slow request {request.method} {request.path}: {elapsed:.3f}s ({stages})")
+        if profiler is not None:
+            path = os.path.join(
+                app.config["PROFILE_DIR"],
+                f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{elapsed * 1000:.0f}ms-"
+                f"{uuid.uuid4().hex[:8]}.prof",
+            )
+            profiler.dump_stats(path)
+            logging.warning(f"Wrote profile to {path}")
+    return response
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -158,13 +1103,14 @@ def index():
     # Default values for the template
     context = {
         'form': form,
-        'time_slots': None,
+        'event_url': None,
         'comparison': None,
         'missing_names': None,
         'best_slots': None,
         'continuous_slots': None,
         'timezone': None,
-        'availability_stats': None
+        'availability_stats': None,
+        'cache_status': None
     }
     
     if request.method == "POST" and form.validate_on_submit():
@@ -175,56 +1121,28 @@ def index():
         logging.info(f"User provided {len(names_list)} names")
         
         try:
-            # Get participant names first
-            participant_names = get_participant_names(when2meet_url)
-            if not participant_names:
-                participant_names = []
-            
-            # Get time slots and availability data
-            analysis = get_participant_data(when2meet_url)
-            
-            # Find missing names
-            missing_names = []
-            comparison = []
-            
-            for name in names_list:
-                best_match = find_best_match(name, participant_names)
-                if best_match:
-                    comparison.append((name, best_match))
-                else:
-                    comparison.append((name, ""))
-                    missing_names.append(name)
-            
-            # Add any remaining When2Meet names
-            for w2m_name in participant_names:
-                if not any(match == w2m_name for _, match in comparison):
-                    comparison.append(("", w2m_name))
-            
-            if analysis:
-                # Update context with actual values
-                context.update({
-                    'comparison': comparison,
-                    'missing_names': missing_names,
-                    'time_slots': analysis.get('time_slots'),
-                    'best_slots': analysis.get('best_slots', []),
-                    'continuous_slots': analysis.get('continuous_slots', {}),
-                    'timezone': analysis.get('timezone', 'Asia/Singapore'),
-                    'availability_stats': {
-                        'total_slots': analysis.get('total_slots', 0),
-                        'max_availability': analysis.get('max_availability', 0),
-                        'avg_availability': analysis.get('avg_availability', 0)
-                    }
-                })
+            result = run_check(
+                names_list,
+                when2meet_url,
+                force_refresh=form.force_refresh.data,
+                one_to_one=form.one_to_one.data,
+                timezone=form.timezone.data,
+            )
+            save_history(get_history_user(create=True), names_list, when2meet_url,
+                         form.force_refresh.data, form.one_to_one.data, form.timezone.data,
+                         result)
+            context.update(result)
+            with timed("template_render"):
                 return render_template("index.html", **context)
-            else:
-                return render_template(
-                    "index.html",
-                    form=form,
-                    comparison=comparison,
-                    missing_names=missing_names,
-                    error="Could not extract time slots from When2Meet."
-                )
-                
+        except EventNotFound:
+            return render_template("index.html", form=form, error=EVENT_NOT_FOUND_ERROR), 404
+        except DriverPoolExhausted as e:
+            logging.warning(f"Rejecting request: {str(e)}")
+            return render_template(
+                "index.html",
+                form=form,
+                error="The server is busy right now. Please try again in a moment."
+            ), 503
         except Exception as e:
             logging.error(f"An error occurred: {str(e)}")
             logging.error(traceback.format_exc())
@@ -237,326 +1155,398 @@ def index():
     return render_template("index.html", **context)
 
 
-@app.errorhandler(429)
-def ratelimit_handler(e):
-    return jsonify(error="Rate limit exceeded. Please try again later."), 429
+@app.route("/batch", methods=["POST"])
+@csrf.exempt
+@limiter.limit("10 per minute")
+def batch():
+    # JSON only, so it can't be triggered by a cross-site form post
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify(error="Expected a JSON object."), 400
 
+    urls = payload.get("urls")
+    names = payload.get("names", [])
+    rosters = payload.get("rosters", {})
+    if not isinstance(urls, list) or not urls:
+        return jsonify(error="'urls' must be a non-empty list."), 400
+    if len(urls) > app.config["BATCH_MAX_URLS"]:
+        return jsonify(error=f"At most {app.config['BATCH_MAX_URLS']} URLs per batch."), 400
+    if not all(is_allowed_event_url(url) for url in urls):
+        return jsonify(error="Every entry in 'urls' must be a When2Meet event link."), 400
+    if not isinstance(rosters, dict):
+        return jsonify(error="'rosters' must map URLs to lists of names."), 400
+    timezone = payload.get("timezone", DEFAULT_TIMEZONE)
+    if not is_known_timezone(timezone):
+        return jsonify(error=f"Unknown time zone: {timezone}"), 400
 
-@app.route('/get_previous_submission/<timestamp>')
-def get_previous_submission(timestamp):
-    previous_submissions = session.get('previous_submissions', [])
-    for submission in previous_submissions:
-        if submission['timestamp'] == timestamp:
-            return jsonify(submission)
-    return jsonify({}), 404
+    entries = []
+    for url in urls:
+        roster = rosters.get(url, names)
+        if not isinstance(roster, list) or not all(isinstance(name, str) for name in roster):
+            return jsonify(error=f"The roster for {url} must be a list of names."), 400
+        entries.append((url, [name.strip() for name in roster if name.strip()]))
+
+    logging.info(f"Received batch of {len(entries)} events")
+    results = run_batch(
+        entries,
+        force_refresh=bool(payload.get("force_refresh")),
+        one_to_one=bool(payload.get("one_to_one")),
+        timezone=timezone,
+    )
+    return jsonify(results=results)
 
 
-def get_participant_data(url):
-    options = Options()
-    options.add_argument("-headless")
-    driver = webdriver.Firefox(options=options)
+@app.route("/jobs", methods=["POST"])
+@limiter.limit("50 per minute")
+def create_job():
+    form = ComparisonForm()
+    if not form.validate_on_submit():
+        return jsonify(error="Invalid submission.", fields=form.errors), 400
 
+    names_list = [name.strip() for name in form.names_list.data.split("\n") if name.strip()]
     try:
-        driver.get(url)
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        job_id = get_job_runner().submit(
+            names_list,
+            form.when2meet_url.data,
+            force_refresh=form.force_refresh.data,
+            one_to_one=form.one_to_one.data,
+            timezone=form.timezone.data,
+            history_user=get_history_user(create=True),
         )
+    except JobQueueFull as e:
+        logging.warning(f"Rejecting job: {str(e)}")
+        return jsonify(error="The server is busy right now. Please try again in a moment."), 503
 
-        script = """
-        function formatTime(timestamp) {
-            // Force Singapore timezone (UTC+8)
-            var date = new Date(timestamp * 1000);
-            date = new Date(date.getTime() + (8 * 60 * 60 * 1000));  // Add 8 hours for SGT
-            
-            var hours = date.getUTCHours();
-            var minutes = date.getUTCMinutes();
-            var ampm = hours >= 12 ? 'PM' : 'AM';
-            hours = hours % 12;
-            hours = hours ? hours : 12;
-            minutes = minutes < 10 ? '0' + minutes : minutes;
-            
-            return hours + ':' + minutes + ' ' + ampm;
-        }
+    logging.info(f"Queued job {job_id} for URL: {form.when2meet_url.data}")
+    return jsonify(id=job_id, status="queued", url=f"/jobs/{job_id}"), 202
 
-        function formatDate(timestamp) {
-            // Force Singapore timezone (UTC+8)
-            var date = new Date(timestamp * 1000);
-            date = new Date(date.getTime() + (8 * 60 * 60 * 1000));  // Add 8 hours for SGT
-            
-            var days = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
-            var months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
-            return days[date.getUTCDay()] + ', ' + months[date.getUTCMonth()] + ' ' + date.getUTCDate();
-        }
 
-        var result = {
-            PeopleNames: window.PeopleNames || [],
-            PeopleIDs: window.PeopleIDs || [],
-            AvailableAtSlot: window.AvailableAtSlot || [],
-            TimeOfSlot: window.TimeOfSlot || [],
-            TimeZone: 'Asia/Singapore'  // Force Singapore timezone
-        };
-
-        var timeSlots = [];
-        for (var i = 0; i < result.TimeOfSlot.length; i++) {
-            timeSlots.push({
-                timestamp: result.TimeOfSlot[i],
-                time: formatTime(result.TimeOfSlot[i]),
-                date: formatDate(result.TimeOfSlot[i]),
-                available: result.AvailableAtSlot[i] || []
-            });
-        }
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    job = get_job_runner().store.get(job_id)
+    if job is None:
+        return jsonify(error="Unknown job."), 404
+    return jsonify(job)
 
-        result.TimeSlots = timeSlots;
-        return JSON.stringify(result);
-        """
 
-        result = json.loads(driver.execute_script(script))
-        
-        # Get all participant names for comparison
-        all_participants = set(result["PeopleNames"])
-        
-        # Process time slots
-        time_slots = []
-        total_participants = len(result["PeopleIDs"])
-        
-        for slot in result["TimeSlots"]:
-            available_people = [
-                result["PeopleNames"][result["PeopleIDs"].index(pid)]
-                for pid in slot["available"]
-            ]
-            
-            # Calculate availability percentage
-            availability_percentage = (len(available_people) / len(result["PeopleIDs"])) * 100
-            
-            time_slot = {
-                "time": slot["time"],
-                "date": slot["date"],
-                "available_people": available_people,
-                "num_available": len(available_people),
-                "timestamp": slot["timestamp"],
-                "availability_percentage": availability_percentage
-            }
-            time_slots.append(time_slot)
+@app.route("/jobs/<job_id>/events")
+@limiter.limit("30 per minute")
+def job_events(job_id):
+    store = get_job_runner().store
+    if store.get(job_id) is None:
+        return jsonify(error="Unknown job."), 404
 
-        logging.info(f"Extracted {len(time_slots)} time slots with availability")
-        
-        # Find best time slots (where most people are available)
-        best_slots = []
-        current_date = None
-        current_date_slots = []
-        
-        for slot in sorted(time_slots, key=lambda x: x["timestamp"]):
-            if slot["availability_percentage"] >= 70:  # At least 70% of people available
-                if current_date != slot["date"]:
-                    if current_date_slots:
-                        best_slots.extend(current_date_slots)
-                    current_date = slot["date"]
-                    current_date_slots = []
-                current_date_slots.append(slot)
-        
-        if current_date_slots:
-            best_slots.extend(current_date_slots)
+    def stream():
+        last_stage = None
+        deadline = time.monotonic() + STREAM_SECONDS
+        while time.monotonic() < deadline:
+            job = store.get(job_id)
+            if job["stage"] != last_stage or job["status"] in JOB_TERMINAL_STATUSES:
+                last_stage = job["stage"]
+                event = job["status"] if job["status"] in JOB_TERMINAL_STATUSES else "progress"
+                data = {key: job[key] for key in ("id", "status", "stage", "error")}
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            if job["status"] in JOB_TERMINAL_STATUSES:
+                return
+            time.sleep(0.5)
 
-        # Sort best slots by availability percentage
-        best_slots.sort(key=lambda x: (-x["availability_percentage"], x["timestamp"]))
-        
-        # Add this before creating the analysis dict
-        if time_slots:
-            max_availability = max(slot["num_available"] for slot in time_slots)
-            avg_availability = sum(slot["num_available"] for slot in time_slots) / len(time_slots)
-        else:
-            max_availability = 0
-            avg_availability = 0
-
-        # Find continuous time blocks (1hr, 2hr, 3hr)
-        def find_continuous_slots(slots, required_slots, min_availability_pct=50):
-            continuous_blocks = []
-            current_block = []
-
-            # Sort slots by timestamp
-            sorted_slots = sorted(slots, key=lambda x: x["timestamp"])
-
-            for i, slot in enumerate(sorted_slots):
-                if slot["availability_percentage"] >= min_availability_pct:
-                    if not current_block:
-                        current_block = [slot]
-                    else:
-                        # Check if this slot is within 15 minutes of the last one
-                        last_timestamp = current_block[-1]["timestamp"]
-                        if slot["timestamp"] - last_timestamp == 900:  # 900 seconds = 15 minutes
-                            current_block.append(slot)
-                        else:
-                            # Gap found, check if previous block meets requirements
-                            if len(current_block) >= required_slots:
-                                continuous_blocks.append(current_block)
-                            current_block = [slot]
-
-                    # Check if we have enough slots for the required duration
-                    if len(current_block) >= required_slots:
-                        continuous_blocks.append(current_block[:])
-                        current_block = current_block[1:]  # Slide window by 1
-                else:
-                    if len(current_block) >= required_slots:
-                        continuous_blocks.append(current_block)
-                    current_block = []
-
-            # Check final block
-            if len(current_block) >= required_slots:
-                continuous_blocks.append(current_block)
-
-            # If no blocks found with current threshold, try with lower thresholds
-            if not continuous_blocks:
-                for threshold in [40, 30, 20]:  # Try progressively lower thresholds
-                    continuous_blocks = []
-                    current_block = []
-                    for i, slot in enumerate(sorted_slots):
-                        if slot["availability_percentage"] >= threshold:
-                            if not current_block:
-                                current_block = [slot]
-                            else:
-                                last_timestamp = current_block[-1]["timestamp"]
-                                if slot["timestamp"] - last_timestamp == 900:
-                                    current_block.append(slot)
-                                else:
-                                    if len(current_block) >= required_slots:
-                                        continuous_blocks.append(current_block)
-                                    current_block = [slot]
-
-                            if len(current_block) >= required_slots:
-                                continuous_blocks.append(current_block[:])
-                                current_block = current_block[1:]
-                        else:
-                            if len(current_block) >= required_slots:
-                                continuous_blocks.append(current_block)
-                            current_block = []
-
-                    if len(current_block) >= required_slots:
-                        continuous_blocks.append(current_block)
-
-                    if continuous_blocks:
-                        break
-
-            return continuous_blocks
-
-        # Find blocks for different durations
-        one_hour_blocks = find_continuous_slots(time_slots, 4)  # 4 x 15min = 1hr
-        two_hour_blocks = find_continuous_slots(time_slots, 8)  # 8 x 15min = 2hr
-        three_hour_blocks = find_continuous_slots(time_slots, 12)  # 12 x 15min = 3hr
-
-        # Process blocks into a more usable format
-        def process_blocks(blocks):
-            processed = []
-            for block in blocks:
-                avg_availability = sum(s["num_available"] for s in block) / len(block)
-                avg_percentage = sum(s["availability_percentage"] for s in block) / len(block)
-                
-                # Get people available for the entire duration
-                common_people = list(set.intersection(*[set(s["available_people"]) for s in block]))
-                
-                # Get people available for at least 75% of the duration
-                min_slots_required = int(len(block) * 0.75)
-                frequently_available = []
-                all_people = set()
-                for s in block:
-                    all_people.update(s["available_people"])
-                
-                for person in all_people:
-                    available_count = sum(1 for s in block if person in s["available_people"])
-                    if available_count >= min_slots_required:
-                        frequently_available.append(person)
-                
-                processed.append({
-                    "start_time": block[0]["time"],
-                    "end_time": block[-1]["time"],
-                    "date": block[0]["date"],
-                    "avg_available": round(avg_availability, 1),
-                    "avg_percentage": round(avg_percentage, 1),
-                    "available_people": common_people if common_people else frequently_available,
-                    "duration_minutes": len(block) * 15
-                })
-            return sorted(processed, key=lambda x: (-x["avg_percentage"], x["date"], x["start_time"]))[:5]
-
-        continuous_slots = {
-            "one_hour": process_blocks(one_hour_blocks),
-            "two_hour": process_blocks(two_hour_blocks),
-            "three_hour": process_blocks(three_hour_blocks)
-        }
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        analysis = {
-            "time_slots": time_slots,
-            "best_slots": best_slots[:5],
-            "continuous_slots": continuous_slots,  # Add this new field
-            "total_slots": len(time_slots),
-            "timezone": "Asia/Singapore",
-            "max_availability": max_availability,
-            "avg_availability": avg_availability,
-            "all_participants": list(all_participants)
-        }
 
-        # In get_participant_data function, after processing the blocks:
-        logging.info(f"Generated continuous slots:")
-        logging.info(f"One hour blocks: {len(continuous_slots['one_hour'])}")
-        logging.info(f"Two hour blocks: {len(continuous_slots['two_hour'])}")
-        logging.info(f"Three hour blocks: {len(continuous_slots['three_hour'])}")
+@app.route("/jobs/<job_id>/view")
+def view_job(job_id):
+    job = get_job_runner().store.get(job_id)
+    if job is None or job["status"] != "done":
+        return render_template(
+            "index.html",
+            form=ComparisonForm(),
+            error=(job or {}).get("error") or "That check is not available."
+        ), 404 if job is None else 409
+    with timed("template_render"):
+        return render_template("index.html", form=ComparisonForm(), **job["result"])
 
-        return analysis
 
-    except Exception as e:
-        logging.error(f"An error occurred: {str(e)}")
-        logging.error(traceback.format_exc())
-        return None
-    finally:
-        driver.quit()
+@app.route("/events/slots")
+@limiter.limit("120 per minute")
+def event_slots():
+    url = request.args.get("url", "")
+    timezone = request.args.get("timezone", DEFAULT_TIMEZONE)
+    people = request.args.get("people", "indices")
+    start_day = request.args.get("start_day", 0, type=int)
+    days = request.args.get("days", SLOT_PAGE_DAYS, type=int)
+    history = request.args.get("history", type=int)
+    if not is_allowed_event_url(url):
+        return jsonify(error="'url' must be a When2Meet event link."), 400
+    if not is_known_timezone(timezone):
+        return jsonify(error=f"Unknown time zone: {timezone}"), 400
+    if people not in SLOT_PEOPLE_FORMATS:
+        return jsonify(error=f"'people' must be one of: {', '.join(SLOT_PEOPLE_FORMATS)}."), 400
+    if start_day < 0 or not 1 <= days <= SLOT_PAGE_MAX_DAYS:
+        return jsonify(error=f"Pages cover 1 to {SLOT_PAGE_MAX_DAYS} days from a day >= 0."), 400
 
+    # A reopened check shows the event as it was, from the snapshot saved with it
+    user_id = get_history_user()
+    if history is not None and user_id:
+        event = get_history_store().get_snapshot(user_id, history)
+        if event is not None:
+            return jsonify(event_slot_page(event, timezone, start_day, days, people))
 
-def process_when2meet_data(driver, names_list):
-    # ... existing code ...
-    
-    # Convert timezone to Singapore
-    sg_timezone = pytz.timezone('Asia/Singapore')
-    
-    # When processing time slots
-    time_slots = []
-    for date_str, times in grouped_slots.items():
-        for time_str, people in times.items():
-            # Convert the datetime to Singapore time
-            dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-            sg_dt = pytz.utc.localize(dt).astimezone(sg_timezone)
-            
-            time_slots.append({
-                'date': sg_dt.strftime("%Y-%m-%d"),
-                'time': sg_dt.strftime("%I:%M %p"),  # 12-hour format with AM/PM
-                'num_available': len(people),
-                'available_people': sorted(people)
-            })
-    
-    # Sort time slots by number of available people (descending)
-    time_slots.sort(key=lambda x: (-x['num_available'], x['date'], x['time']))
-    
-    # Get the best slots (slots with maximum availability)
-    max_availability = round(max(slot['num_available'] for slot in time_slots) if time_slots else 0, 2)
-    best_slots = [slot for slot in time_slots if slot['num_available'] == max_availability]
-    
-    # Filter for reasonable meeting times (e.g., 9 AM to 6 PM)
-    business_hours_slots = [
-        slot for slot in best_slots
-        if 9 <= int(datetime.strptime(slot['time'], "%I:%M %p").strftime("%H")) <= 18
-    ]
-    
-    # Use business hours slots if available, otherwise use all best slots
-    recommended_slots = business_hours_slots if business_hours_slots else best_slots
-    recommended_slots = recommended_slots[:5]  # Top 5 recommendations
-    
-    logging.info(f"Max availability: {max_availability}")
-    return {
-        'time_slots': time_slots,
-        'best_slots': recommended_slots,
-        'availability_stats': {
-            'total_slots': len(time_slots),
-            'max_availability': max_availability,
-            'avg_availability': sum(slot['num_available'] for slot in time_slots) / len(time_slots) if time_slots else 0
-        }
-    }
+    try:
+        event = get_event_snapshot(url, timezone)
+    except EventNotFound:
+        return jsonify(error=EVENT_NOT_FOUND_ERROR), 404
+    except DriverPoolExhausted as e:
+        logging.warning(f"Rejecting request: {str(e)}")
+        return jsonify(error="The server is busy right now. Please try again in a moment."), 503
+    if event is None:
+        return jsonify(error="Could not extract time slots from When2Meet."), 404
+
+    return jsonify(event_slot_page(event, timezone, start_day, days, people))
+
+
+@app.route("/events/snapshot")
+@limiter.limit("30 per minute")
+def export_snapshot():
+    url = request.args.get("url", "")
+    force_refresh = request.args.get("force_refresh") in ("1", "true")
+    if not is_allowed_event_url(url):
+        return jsonify(error="'url' must be a When2Meet event link."), 400
+    try:
+        event = load_event(url, force_refresh=force_refresh)[0]
+    except EventNotFound:
+        return jsonify(error=EVENT_NOT_FOUND_ERROR), 404
+    except DriverPoolExhausted as e:
+        logging.warning(f"Rejecting request: {str(e)}")
+        return jsonify(error="The server is busy right now. Please try again in a moment."), 503
+    if event is None:
+        return jsonify(error="Could not extract time slots from When2Meet."), 404
+
+    filename = re.sub(r"[^\w-]", "_", urlsplit(url).query or "event") + ".w2ms"
+    return Response(
+        dump_snapshot(event),
+        mimetype="application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@app.route("/snapshots/check", methods=["POST"])
+@csrf.exempt
+@limiter.limit("10 per minute")
+def check_snapshot():
+    # Multipart upload: the snapshot file plus the same options as /batch
+    upload = request.files.get("snapshot")
+    if upload is None:
+        return jsonify(error="Upload the snapshot as the 'snapshot' file field."), 400
+    timezone = request.form.get("timezone", DEFAULT_TIMEZONE)
+    if not is_known_timezone(timezone):
+        return jsonify(error=f"Unknown time zone: {timezone}"), 400
+    names_list = [name.strip() for name in request.form.get("names", "").split("\n") if name.strip()]
+    try:
+        event = load_snapshot(upload.read())
+    except SnapshotError as e:
+        return jsonify(error=str(e)), 400
+
+    with timed("analysis"):
+        analysis = get_participant_data(event, timezone)
+    result = build_check_result(
+        names_list, event, analysis, {"hit": False, "age_seconds": 0},
+        one_to_one=request.form.get("one_to_one") in ("1", "true", "on"),
+    )
+    result.pop("event_url", None)
+    return jsonify(result)
+
+
+@app.route("/events/windows", methods=["POST"])
+@csrf.exempt
+@limiter.limit("60 per minute")
+def event_windows():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify(error="Expected a JSON object."), 400
+
+    url = payload.get("url", "")
+    timezone = payload.get("timezone", DEFAULT_TIMEZONE)
+    limit = payload.get("limit", 5)
+    if not is_allowed_event_url(url):
+        return jsonify(error="'url' must be a When2Meet event link."), 400
+    if not is_known_timezone(timezone):
+        return jsonify(error=f"Unknown time zone: {timezone}"), 400
+    if not isinstance(limit, int) or not 1 <= limit <= WINDOW_MAX_LIMIT:
+        return jsonify(error=f"'limit' must be between 1 and {WINDOW_MAX_LIMIT}."), 400
+    try:
+        constraints = WindowConstraints.from_json(payload.get("constraints", {}))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    try:
+        event, _, cache_status = load_event(
+            url, force_refresh=bool(payload.get("force_refresh")), timezone=timezone
+        )
+    except EventNotFound:
+        return jsonify(error=EVENT_NOT_FOUND_ERROR), 404
+    except DriverPoolExhausted as e:
+        logging.warning(f"Rejecting request: {str(e)}")
+        return jsonify(error="The server is busy right now. Please try again in a moment."), 503
+    if event is None:
+        return jsonify(error="Could not extract time slots from When2Meet."), 404
+
+    try:
+        with timed("ranking"):
+            windows = rank_windows(event, constraints, timezone, limit)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(timezone=timezone, age_seconds=cache_status["age_seconds"], windows=windows)
+
+
+@app.before_first_request
+def start_watch_scheduler():
+    if app.config["WATCH_POLLER"]:
+        get_watch_scheduler().start()
+
+
+@app.route("/watches", methods=["POST"])
+@csrf.exempt
+@limiter.limit("10 per minute")
+def create_watch():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify(error="Expected a JSON object."), 400
+
+    url = payload.get("url", "")
+    names = payload.get("names")
+    timezone = payload.get("timezone", DEFAULT_TIMEZONE)
+    webhook = payload.get("webhook")
+    if not is_allowed_event_url(url):
+        return jsonify(error="'url' must be a When2Meet event link."), 400
+    if not isinstance(names, list) or not names or not all(isinstance(name, str) for name in names):
+        return jsonify(error="'names' must be a non-empty list of names."), 400
+    if not is_known_timezone(timezone):
+        return jsonify(error=f"Unknown time zone: {timezone}"), 400
+    if webhook is not None and not is_allowed_webhook(webhook):
+        allowed = ", ".join(app.config["WATCH_WEBHOOK_HOSTS"])
+        return jsonify(error=f"'webhook' must be an http(s) URL on one of: {allowed}."), 400
+
+    scheduler = get_watch_scheduler()
+    try:
+        watch_id = scheduler.store.create(
+            url,
+            [name.strip() for name in names if name.strip()],
+            bool(payload.get("one_to_one")),
+            timezone,
+            webhook,
+            ttl=app.config["WATCH_TTL"],
+            min_interval=app.config["WATCH_MIN_INTERVAL"],
+            max_active=app.config["WATCH_MAX_ACTIVE"],
+        )
+    except WatchLimitReached as e:
+        logging.warning(f"Rejecting watch: {str(e)}")
+        return jsonify(error="Too many events are being watched right now."), 503
+    if app.config["WATCH_POLLER"]:
+        scheduler.start()
+
+    logging.info(f"Watching {url} as {watch_id}")
+    return jsonify(id=watch_id, url=f"/watches/{watch_id}"), 201
+
+
+@app.route("/watches/<watch_id>", methods=["GET", "DELETE"])
+@csrf.exempt
+def watch(watch_id):
+    store = get_watch_scheduler().store
+    if request.method == "DELETE":
+        if not store.delete(watch_id):
+            return jsonify(error="Unknown watch."), 404
+        return "", 204
+    found = store.get(watch_id)
+    if found is None:
+        return jsonify(error="Unknown watch."), 404
+    return jsonify(found)
+
+
+@app.route("/watches/<watch_id>/events")
+@limiter.limit("10 per minute")
+def watch_events(watch_id):
+    store = get_watch_scheduler().store
+    if store.get(watch_id) is None:
+        return jsonify(error="Unknown watch."), 404
+    last_seq = request.headers.get("Last-Event-ID", 0, type=int)
+
+    def stream():
+        # Clients resume from the last id they saw when they reconnect
+        seq = last_seq
+        deadline = time.monotonic() + STREAM_SECONDS
+        while True:
+            for seq, event in store.events_since(watch_id, seq):
+                yield f"id: {seq}\nevent: update\ndata: {json.dumps(event)}\n\n"
+            if store.get(watch_id) is None or time.monotonic() >= deadline:
+                return
+            # Comment lines keep proxies from closing an idle stream
+            yield ": keep-alive\n\n"
+            time.sleep(min(5, max(0, deadline - time.monotonic())))
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/metrics")
+def metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+@app.errorhandler(429)
+def ratelimit_handler(e):
+    RATE_LIMITED.labels(request.endpoint or "unknown").inc()
+    return jsonify(error="Rate limit exceeded. Please try again later."), 429
+
+
+@app.errorhandler(413)
+def request_too_large_handler(e):
+    return jsonify(error=f"Request is larger than {app.config['MAX_CONTENT_LENGTH']} bytes."), 413
+
+
+@app.context_processor
+def inject_previous_submissions():
+    user_id = get_history_user()
+    return {"previous_submissions": get_history_store().recent(user_id) if user_id else []}
+
+
+@app.route('/get_previous_submission/<int:timestamp>')
+def get_previous_submission(timestamp):
+    user_id = get_history_user()
+    submission = get_history_store().get(user_id, timestamp) if user_id else None
+    if submission is None:
+        return jsonify({}), 404
+    return jsonify(submission)
+
+
+@app.route("/history/<int:timestamp>")
+def view_history(timestamp):
+    user_id = get_history_user()
+    submission = get_history_store().get(user_id, timestamp) if user_id else None
+    if submission is None:
+        return render_template(
+            "index.html", form=ComparisonForm(), error="That check is not available."
+        ), 404
+    with timed("template_render"):
+        return render_template(
+            "index.html", form=ComparisonForm(), history_timestamp=timestamp,
+            **submission["result"]
+        )
+
+
+if app.config["EXTRACTOR"] == "selenium":
+    threading.Thread(target=lambda: get_extractor().warm(), daemon=True).start()
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,217 @@
+"""Time the analysis and matching hot paths on synthetic events.
+
+    python benchmarks/run.py --days 7 --people 60 --output results.json
+
+Prints one JSON document with the parameters, the environment and, for each
+benchmark, its timings, throughput and peak traced memory, so runs from
+different releases can be compared. Everything runs offline; the end-to-end
+benchmark serves the synthetic event from a local HTTP server.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import w2m  # noqa: E402
+from benchmarks.synthetic import make_event, make_roster, render_event_html  # noqa: E402
+
+RESULT_VERSION = 1
+
+
+def measure(name, func, repeat, items):
+    """Run `func` `repeat` times and once more under tracemalloc for peak memory."""
+    func()  # warm caches and lazy imports outside the timings
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "name": name,
+        "repeat": repeat,
+        "min_s": min(timings),
+        "median_s": median,
+        "mean_s": statistics.mean(timings),
+        "items": items,
+        "items_per_s": items / median if median else None,
+        "peak_bytes": peak,
+    }
+
+
+def analysis_benchmarks(event, roster, timezone, repeat):
+    slots = len(event.slot_times)
+    matrix = w2m.AvailabilityMatrix(event)
+    clock = w2m.SlotClock(timezone)
+    finder = w2m.BlockFinder(matrix)
+
+    def continuous_slots():
+        for minutes in (60, 120, 180):
+            w2m.find_continuous_slots(finder, clock, minutes)
+
+    def match_each():
+        for name in roster:
+            w2m.find_best_match(name, event.people_names)
+
+    def match_indexed():
+        matcher = w2m.NameMatcher(event.people_names)
+        for name in roster:
+            matcher.match(name)
+
+    snapshot = w2m.dump_snapshot(event)
+
+    return [
+        measure("snapshot_dump", lambda: w2m.dump_snapshot(event), repeat, slots),
+        measure("snapshot_load", lambda: w2m.load_snapshot(snapshot), repeat, slots),
+        measure("availability_matrix", lambda: w2m.AvailabilityMatrix(event), repeat, slots),
+        # A fresh clock each run so label caching doesn't hide the formatting cost
+        measure("time_slots", lambda: w2m.build_time_slots(matrix, w2m.SlotClock(timezone)),
+                repeat, slots),
+        measure("best_slots", lambda: w2m.find_best_slots(matrix, clock), repeat, slots),
+        measure("block_finder", lambda: w2m.BlockFinder(matrix), repeat, slots),
+        measure("continuous_slots", continuous_slots, repeat, slots),
+        measure("get_participant_data", lambda: w2m.get_participant_data(event, timezone),
+                repeat, slots),
+        measure("find_best_match", match_each, repeat, len(roster)),
+        measure("name_matcher", match_indexed, repeat, len(roster)),
+        measure("assign_names", lambda: w2m.assign_names(roster, event.people_names),
+                repeat, len(roster)),
+    ]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves the same rendered event page for every path."""
+
+    page = b""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(self.page)))
+        self.end_headers()
+        self.wfile.write(self.page)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def end_to_end_benchmarks(event, roster, timezone, repeat):
+    # The web app is only imported here, so --skip-end-to-end runs without Flask
+    import app as web
+
+    StandInHandler.page = render_event_html(event).encode()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/?{event.url.rsplit('?', 1)[-1]}"
+
+    web.app.config.update(EXTRACTOR="http", EVENT_HOSTS=["127.0.0.1"], WTF_CSRF_ENABLED=False)
+    web.limiter.enabled = False
+    client = web.app.test_client()
+    form = {"names_list": "\n".join(roster), "when2meet_url": url, "timezone": timezone,
+            "force_refresh": "y"}
+
+    def check():
+        result = web.run_check(roster, url, force_refresh=True, timezone=timezone)
+        assert "error" not in result, result["error"]
+
+    def page():
+        response = client.post("/", data=form)
+        assert response.status_code == 200, response.status_code
+
+    try:
+        return [
+            measure("end_to_end_check", check, repeat, len(event.slot_times)),
+            measure("end_to_end_page", page, repeat, len(event.slot_times)),
+        ]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--slot-minutes", type=int, default=15)
+    parser.add_argument("--hours-per-day", type=int, default=12)
+    parser.add_argument("--people", type=int, default=40)
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="share of slots each respondent is free for")
+    parser.add_argument("--roster-size", type=int, default=None,
+                        help="roster names to match (default: one per respondent)")
+    parser.add_argument("--typo-rate", type=float, default=0.3)
+    parser.add_argument("--missing-rate", type=float, default=0.1)
+    parser.add_argument("--timezone", default=w2m.DEFAULT_TIMEZONE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--snapshot", help="benchmark a saved .w2ms snapshot instead of a "
+                                           "synthetic event")
+    parser.add_argument("--skip-end-to-end", action="store_true")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # The app logs every request and analysis; that would dominate the timings
+    logging.disable(logging.CRITICAL)
+
+    if args.snapshot:
+        with open(args.snapshot, "rb") as f:
+            event = w2m.load_snapshot(f.read())
+    else:
+        event = make_event(days=args.days, slot_minutes=args.slot_minutes,
+                           hours_per_day=args.hours_per_day, people=args.people,
+                           density=args.density, seed=args.seed)
+    roster = make_roster(event, size=args.roster_size, typo_rate=args.typo_rate,
+                         missing_rate=args.missing_rate, seed=args.seed)
+
+    results = analysis_benchmarks(event, roster, args.timezone, args.repeat)
+    if not args.skip_end_to_end:
+        results += end_to_end_benchmarks(event, roster, args.timezone, args.repeat)
+
+    report = {
+        "version": RESULT_VERSION,
+        "created_at": datetime.now(dt_timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+        },
+        "parameters": vars(args),
+        "event": {"slots": len(event.slot_times), "people": len(event.people_names),
+                  "roster": len(roster)},
+        "results": results,
+        # ru_maxrss is in kilobytes on Linux
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    for result in results:
+        print(f"{result['name']:<22} {result['median_s'] * 1000:10.2f} ms "
+              f"{result['peak_bytes'] / 1024:10.0f} KiB", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
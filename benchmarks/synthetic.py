@@ -0,0 +1,162 @@
+"""Synthetic When2Meet events and rosters for the benchmarks."""
+import random
+import string
+
+from w2m.event import EventSnapshot
+
+FIRST_NAMES = [
+    "Aaron", "Alicia", "Amir", "Bryan", "Cheryl", "Daniel", "Darren", "Elaine", "Farah",
+    "Gabriel", "Grace", "Hui Min", "Isaac", "Jasmine", "Jun Wei", "Kai", "Kumar", "Li Ting",
+    "Marcus", "Mei Ling", "Nadia", "Nicholas", "Priya", "Rachel", "Rahul", "Sean", "Siti",
+    "Sophia", "Timothy", "Veronica", "Wei Jie", "Xin Yi", "Yusuf", "Zachary",
+]
+LAST_NAMES = [
+    "Abdullah", "Chan", "Chew", "Goh", "Hassan", "Ho", "Koh", "Kumar", "Lee", "Lim", "Low",
+    "Menon", "Ng", "Ong", "Pillai", "Quek", "Rahman", "Seah", "Siew", "Tan", "Teo", "Wong",
+    "Yeo",
+]
+
+# Neighbouring keys on a QWERTY keyboard, for fat-finger substitutions
+KEYBOARD_ROWS = ["qwertyuiop", "asdfghjkl", "zxcvbnm"]
+KEYBOARD_NEIGHBOURS = {
+    key: row[max(i - 1, 0):i] + row[i + 1:i + 2]
+    for row in KEYBOARD_ROWS
+    for i, key in enumerate(row)
+}
+
+EPOCH = 1736121600  # Mon, Jan 6 2025 00:00 UTC
+
+
+def make_names(count, rng):
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in seen:
+            # Real events run out of unique combinations too; people add an initial
+            name = f"{name} {rng.choice(string.ascii_uppercase)}"
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def make_event(days=7, slot_minutes=15, hours_per_day=12, people=30, density=0.5, seed=0,
+               start=EPOCH + 3600):
+    """Return an EventSnapshot shaped like a real When2Meet event.
+
+    Each respondent alternates between free and busy runs rather than picking
+    slots independently, with `density` the long-run share of free slots.
+    """
+    rng = random.Random(seed)
+    names = make_names(people, rng)
+    ids = rng.sample(range(10_000_000, 100_000_000), people)
+
+    step = slot_minutes * 60
+    per_day = hours_per_day * 3600 // step
+    slot_times = [start + day * 86400 + k * step for day in range(days) for k in range(per_day)]
+
+    # Two-state Markov chain whose stationary share of free slots is `density`
+    switch = 0.25
+    to_busy = switch * (1 - density)
+    to_free = switch * density
+    available_at_slot = [[] for _ in slot_times]
+    for pid in ids:
+        free = rng.random() < density
+        for slots in available_at_slot:
+            if free:
+                slots.append(pid)
+            free = rng.random() >= to_busy if free else rng.random() < to_free
+
+    return EventSnapshot(
+        url=f"https://www.when2meet.com/?{seed}-bench",
+        people_names=names,
+        people_ids=ids,
+        slot_times=slot_times,
+        available_at_slot=available_at_slot,
+        timezone="Asia/Singapore",
+    )
+
+
+def _transpose(name, rng):
+    i = rng.randrange(len(name) - 1)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def _delete(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:]
+
+
+def _double(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + name[i] + name[i:]
+
+
+def _fat_finger(name, rng):
+    positions = [i for i, char in enumerate(name) if char.lower() in KEYBOARD_NEIGHBOURS]
+    i = rng.choice(positions)
+    return name[:i] + rng.choice(KEYBOARD_NEIGHBOURS[name[i].lower()]) + name[i + 1:]
+
+
+def _first_name_only(name, rng):
+    return name.rsplit(" ", 1)[0]
+
+
+def _surname_first(name, rng):
+    first, last = name.rsplit(" ", 1)
+    return f"{last} {first}"
+
+
+def _case_and_spacing(name, rng):
+    return rng.choice([name.lower(), name.upper(), f" {name}  ", name.replace(" ", "  ")])
+
+
+TYPOS = [_transpose, _delete, _double, _fat_finger, _first_name_only, _surname_first,
+         _case_and_spacing]
+
+
+def make_typo(name, rng):
+    return rng.choice(TYPOS)(name, rng)
+
+
+def make_roster(event, size=None, typo_rate=0.3, missing_rate=0.1, seed=0):
+    """Return roster names for `event`: mostly respondents, some misspelt, some absent."""
+    rng = random.Random(seed)
+    size = len(event.people_names) if size is None else size
+    respondents = rng.sample(event.people_names, min(size, len(event.people_names)))
+
+    roster = []
+    taken = set(event.people_names)
+    for name in respondents:
+        if rng.random() < missing_rate:
+            # Someone on the roster who never filled in the event
+            name = make_names(1, rng)[0]
+            while name in taken:
+                name = make_names(1, rng)[0]
+            taken.add(name)
+        elif rng.random() < typo_rate:
+            name = make_typo(name, rng)
+        roster.append(name)
+    return roster
+
+
+def render_event_html(event):
+    """Render `event` the way When2Meet's page embeds it, for parse_event_html."""
+    lines = []
+    for i, (name, pid) in enumerate(zip(event.people_names, event.people_ids)):
+        escaped = name.replace("\\", "\\\\").replace("'", "\\'")
+        lines.append(f"PeopleNames[{i}] = '{escaped}';PeopleIDs[{i}] = {pid};")
+    for i, (timestamp, pids) in enumerate(zip(event.slot_times, event.available_at_slot)):
+        lines.append(f"TimeOfSlot[{i}]={timestamp};")
+        lines.append(f"AvailableAtSlot[{i}] = new Array();")
+        lines.extend(f"AvailableAtSlot[{i}].push({pid});" for pid in pids)
+
+    return (
+        "<html><head><title>Benchmark event - When2meet</title></head><body>\n"
+        '<select id="ParticipantTimeZone" name="ParticipantTimeZone">\n'
+        f'<option value="{event.timezone}" selected="selected">{event.timezone}</option>\n'
+        "</select>\n"
+        "<script type=\"text/javascript\">\n" + "\n".join(lines) + "\n</script>\n"
+        "</body></html>\n"
+    )
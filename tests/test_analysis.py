@@ -0,0 +1,202 @@
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import pytz
+
+from w2m.analysis import (
+    AvailabilityMatrix, BlockFinder, SlotClock, WindowConstraints, detect_slot_step, rank_windows,
+)
+from w2m.event import EventSnapshot, parse_event_html
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+EVENT_URL = "https://www.when2meet.com/?12345678-AbCdE"
+
+
+@pytest.fixture
+def event():
+    html = (FIXTURES / "when2meet_event.html").read_text(encoding="utf-8")
+    return parse_event_html(html, EVENT_URL)
+
+
+def make_event(people, available_at_slot, start=1736125200, step=900):
+    """An event with `people` respondents and the given available IDs per slot."""
+    return EventSnapshot(
+        url=EVENT_URL,
+        people_names=[f"Person {i}" for i in range(people)],
+        people_ids=list(range(people)),
+        slot_times=[start + i * step for i in range(len(available_at_slot))],
+        available_at_slot=available_at_slot,
+    )
+
+
+@pytest.mark.parametrize("people, available, threshold", [
+    (194, 97, 50), (385, 77, 20), (390, 117, 30), (7, 7, 100),
+])
+def test_percentages_exact_at_thresholds(people, available, threshold):
+    matrix = AvailabilityMatrix(make_event(people, [list(range(available))] * 4))
+    assert matrix.percentages.tolist() == [threshold] * 4
+    if threshold < 100:
+        starts, length, _, _ = BlockFinder(matrix, thresholds=(threshold,)).find(60)
+        assert (starts.tolist(), length) == ([0], 4)
+
+
+def brute_force_blocks(event, length, thresholds=BlockFinder.THRESHOLDS):
+    """Every window of `length` back-to-back slots, scanned slot by slot."""
+    people = len(event.people_ids)
+    slots = sorted(zip(event.slot_times, event.available_at_slot))
+    step = BlockFinder(AvailabilityMatrix(event)).step
+    for threshold in thresholds:
+        windows = []
+        for start in range(len(slots) - length + 1):
+            window = slots[start:start + length]
+            if all(len(pids) * 100.0 / people >= threshold for _, pids in window) and all(
+                b[0] - a[0] == step for a, b in zip(window, window[1:])
+            ):
+                windows.append((start, sum(len(pids) for _, pids in window) / length))
+        if windows:
+            return windows
+    return []
+
+
+@pytest.mark.parametrize("minutes", [15, 60, 120, 180, 240])
+def test_block_finder_matches_brute_force(event, minutes):
+    starts, length, avg_counts, _ = BlockFinder(AvailabilityMatrix(event)).find(minutes)
+    assert length == minutes // 15
+    expected = brute_force_blocks(event, length)
+    assert starts.tolist() == [start for start, _ in expected]
+    assert avg_counts.tolist() == pytest.approx([average for _, average in expected])
+
+
+def test_block_finder_falls_back_to_lower_threshold(event):
+    # Three hours only fit once two of six people (33%) are enough
+    finder = BlockFinder(AvailabilityMatrix(event))
+    assert finder.longest_runs[:3] == [8, 8, 13]
+    starts, _, _, avg_percentages = finder.find(180)
+    assert starts.tolist() == [0, 19, 20]
+    assert avg_percentages[0] == pytest.approx(finder.matrix.percentages[:12].mean())
+
+
+def test_block_finder_detects_step_and_gaps():
+    # Half-hour slots, out of order, with a missing hour in the middle
+    times = [0, 1, 2, 5, 6, 7, 3]
+    event = make_event(4, [[0, 1, 2]] * 7, step=1800)
+    event = replace(event, slot_times=[event.slot_times[0] + t * 1800 for t in times])
+    finder = BlockFinder(AvailabilityMatrix(event))
+    assert finder.step == 1800
+    # 45 minutes round up to two slots
+    starts, length, _, _ = finder.find(45)
+    assert length == 2
+    assert starts.tolist() == [start for start, _ in brute_force_blocks(event, 2)]
+    assert finder.find(150)[0].tolist() == []
+
+
+def test_matrix_from_fixture(event):
+    matrix = AvailabilityMatrix(event)
+    assert matrix.available.shape == (32, 6)
+    assert matrix.counts.tolist() == [len(pids) for pids in event.available_at_slot]
+    assert matrix.people_at(0) == ["Alice Tan", "Bryan O'Neil", "Daniel Koh"]
+    # Farhan Ismail never marked a time
+    assert not matrix.available[:, 5].any()
+
+
+@pytest.mark.parametrize("timezone, day", [
+    ("Asia/Singapore", "2025-01-06"),
+    ("America/New_York", "2025-03-09"),
+    ("America/New_York", "2025-11-02"),
+    ("Australia/Lord_Howe", "2025-04-06"),
+    ("Asia/Kolkata", "2025-01-06"),
+])
+def test_slot_clock_matches_per_slot_conversion(timezone, day):
+    # Two days of 15-minute slots around `day`, which has a DST change in most zones
+    start = int(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=pytz.utc).timestamp()) - 86400
+    timestamps = list(range(start, start + 3 * 86400, 900))
+    clock = SlotClock(timezone)
+    dates, times = clock.labels(timestamps)
+    for timestamp, seconds, date, time_label in zip(
+        timestamps, clock.local_seconds(timestamps).tolist(), dates, times
+    ):
+        local = datetime.fromtimestamp(timestamp, pytz.timezone(timezone))
+        assert seconds == timestamp + local.utcoffset().total_seconds()
+        assert date == f"{local.strftime('%a, %b')} {local.day}"
+        assert time_label == local.strftime("%I:%M %p").lstrip("0")
+
+
+def test_slot_clock_labels_fixture(event):
+    clock = SlotClock("Asia/Singapore")
+    dates, times = clock.labels(event.slot_times)
+    assert (dates[0], times[0]) == ("Mon, Jan 6", "9:00 AM")
+    assert (dates[-1], times[-1]) == ("Tue, Jan 7", "12:45 PM")
+    assert clock.abbreviation(event.slot_times[0]) == "UTC+08"
+    assert SlotClock("America/New_York").abbreviation(event.slot_times[0]) == "EST"
+
+
+def brute_force_windows(event, constraints, timezone, limit):
+    """Check every window of every allowed length, then pick greedily, best first."""
+    tz = pytz.timezone(timezone)
+    slots = sorted(zip(event.slot_times, event.available_at_slot))
+    step = detect_slot_step(event.slot_times)
+    required = {event.people_ids[event.people_names.index(name)] for name in constraints.required}
+
+    def acceptable(timestamp, pids):
+        local = datetime.fromtimestamp(timestamp, tz)
+        seconds = local.hour * 3600 + local.minute * 60
+        return (
+            constraints.earliest_seconds <= seconds
+            and seconds + step <= constraints.latest_seconds
+            and len(pids) >= constraints.min_attendance
+            and local.weekday() not in constraints.excluded_weekdays
+            and local.date() not in constraints.excluded_dates
+            and required <= set(pids)
+        )
+
+    candidates = []
+    shortest = -(-constraints.min_minutes * 60 // step)
+    longest = -(-constraints.max_minutes * 60 // step)
+    for length in range(shortest, longest + 1):
+        for start in range(len(slots) - length + 1):
+            window = slots[start:start + length]
+            days = {datetime.fromtimestamp(timestamp, tz).date() for timestamp, _ in window}
+            if len(days) == 1 and all(acceptable(*slot) for slot in window) and all(
+                b[0] - a[0] == step for a, b in zip(window, window[1:])
+            ):
+                average = sum(len(pids) for _, pids in window) / length
+                candidates.append((-average, -length, start))
+
+    chosen = []
+    for _, negative_length, start in sorted(candidates):
+        end = start - negative_length
+        if len(chosen) < limit and all(end <= s or e <= start for s, e in chosen):
+            chosen.append((start, end))
+    return [(slots[start][0], slots[end - 1][0] + step) for start, end in chosen]
+
+
+@pytest.mark.parametrize("timezone", ["Asia/Singapore", "America/Halifax"])
+@pytest.mark.parametrize("limit", [5, 50])
+@pytest.mark.parametrize("constraints", [
+    {},
+    {"min_minutes": 45, "max_minutes": 120},
+    {"min_minutes": 30, "max_minutes": 90, "earliest": "09:30", "latest": "12:00"},
+    {"min_minutes": 15, "max_minutes": 180, "required": ["Esther Lim"], "min_attendance": 3},
+    {"min_minutes": 15, "max_minutes": 60, "excluded_days": ["mon"]},
+    {"max_minutes": 120, "excluded_days": ["2025-01-07"], "required": ["Chen Wei Ling", "Daniel Koh"]},
+])
+def test_rank_windows_matches_brute_force(event, constraints, timezone, limit):
+    constraints = WindowConstraints(**constraints)
+    windows = rank_windows(event, constraints, timezone=timezone, limit=limit)
+    assert [(w["start_timestamp"], w["end_timestamp"]) for w in windows] == \
+        brute_force_windows(event, constraints, timezone, limit)
+
+
+def test_rank_windows_rounds_durations_up(event):
+    windows = rank_windows(event, WindowConstraints(min_minutes=50, max_minutes=50), limit=50)
+    assert windows
+    assert {w["duration_minutes"] for w in windows} == {60}
+    best = windows[0]
+    assert (best["date"], best["start_time"], best["end_time"]) == ("Mon, Jan 6", "10:15 AM", "11:15 AM")
+    assert (best["avg_available"], best["min_available"]) == (5.0, 5)
+    everyone = set.intersection(*(set(pids) for pids in event.available_at_slot[5:9]))
+    assert best["available_people"] == [
+        name for name, pid in zip(event.people_names, event.people_ids) if pid in everyone
+    ]
@@ -0,0 +1,23 @@
+import pytest
+
+import app as w2m_app
+
+EVENT_URL = "https://www.when2meet.com/?12345678-AbCdE"
+
+
+@pytest.fixture
+def client():
+    w2m_app.app.config["RATELIMIT_ENABLED"] = False
+    return w2m_app.app.test_client()
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/batch", {"urls": [EVENT_URL], "names": ["Alice Tan"]}),
+    ("/events/windows", {"url": EVENT_URL}),
+    ("/watches", {"url": EVENT_URL, "names": ["Alice Tan"]}),
+])
+@pytest.mark.parametrize("timezone", [[], {}, 8, "Mars/Olympus_Mons"])
+def test_unknown_timezone_is_rejected(client, path, body, timezone):
+    response = client.post(path, json=dict(body, timezone=timezone))
+    assert response.status_code == 400
+    assert "time zone" in response.get_json()["error"]
@@ -0,0 +1,134 @@
+import random
+from itertools import permutations
+from pathlib import Path
+
+import pytest
+from rapidfuzz import fuzz
+
+from w2m.event import parse_event_html
+from w2m.matching import NameMatcher, assign_names, compare_names, normalize_name
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+EVENT_URL = "https://www.when2meet.com/?12345678-AbCdE"
+
+
+@pytest.fixture
+def participants():
+    html = (FIXTURES / "when2meet_event.html").read_text(encoding="utf-8")
+    # Near-duplicates of the fixture names make ties and close calls likely
+    return parse_event_html(html, EVENT_URL).people_names + [
+        "Alice Tam", "Alice Tang", "Daniel Ko", "Chen Wei Lin", "Esther Lin",
+    ]
+
+
+def linear_match(name, participant_names, threshold=90):
+    # The original matcher: the first participant with the best rounded ratio
+    best_match = None
+    best_ratio = 0
+    for participant in participant_names:
+        ratio = round(fuzz.ratio(name.lower(), participant.lower()))
+        if ratio > best_ratio:
+            best_ratio = ratio
+            best_match = participant
+    return best_match if best_ratio >= threshold else None
+
+
+def misspell(rng, name, edits):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    chars = list(name)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        action = rng.choice(("insert", "delete", "replace"))
+        if action == "insert":
+            chars.insert(i, rng.choice(letters))
+        elif action == "delete" and len(chars) > 1:
+            del chars[i]
+        else:
+            chars[i] = rng.choice(letters)
+    return "".join(chars)
+
+
+@pytest.mark.parametrize("threshold", [90, 80, 60])
+def test_matcher_agrees_with_linear_scan(participants, threshold):
+    rng = random.Random(threshold)
+    matcher = NameMatcher(participants, threshold)
+    names = [misspell(rng, rng.choice(participants), rng.randrange(4)) for _ in range(500)]
+    names += [name.upper() for name in participants] + ["", "Zed", "Alice Tan Wei Ling"]
+    for name in names:
+        assert matcher.match(name) == linear_match(name, participants, threshold), name
+
+
+def test_ties_go_to_first_listed():
+    # "christophir lee" is one substitution from both (93)
+    names = ["Christopher Lee", "Christophor Lee"]
+    assert NameMatcher(names).match("Christophir Lee") == "Christopher Lee"
+    assert NameMatcher(names[::-1]).match("Christophir Lee") == "Christophor Lee"
+
+
+def test_normalized_names_match_exactly(participants):
+    matcher = NameMatcher(participants)
+    assert matcher.match("  ALICE   tan ") == "Alice Tan"
+    assert matcher.match("daniel koh") == "Daniel Koh"
+
+
+def best_total(names, participant_names, threshold=90):
+    # Highest total score over every one-to-one assignment, tried exhaustively
+    scores = [
+        [round(fuzz.ratio(name.lower(), participant.lower())) for participant in participant_names]
+        for name in names
+    ]
+    padded = list(range(len(participant_names))) + [None] * len(names)
+    return max(
+        sum(scores[row][col] for row, col in enumerate(cols)
+            if col is not None and scores[row][col] >= threshold)
+        for cols in permutations(padded, len(names))
+    )
+
+
+def test_one_to_one_beats_independent_matching():
+    participant_names = ["Chen Wei Ling", "Chen Wei Lin"]
+    names = ["Chen Wei Lng", "Chen Wei Ling X"]
+    # Picked independently, both names take Chen Wei Ling
+    assert [linear_match(name, participant_names) for name in names] == ["Chen Wei Ling"] * 2
+
+    first, second = assign_names(names, participant_names)
+    assert (first["match"], first["score"]) == ("Chen Wei Lin", 92)
+    assert (first["runner_up"], first["runner_up_score"]) == ("Chen Wei Ling", 96)
+    assert (second["match"], second["score"]) == ("Chen Wei Ling", 93)
+    assert second["runner_up"] is None
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_assignment_is_optimal(participants, seed):
+    rng = random.Random(seed)
+    pool = rng.sample(participants, 5)
+    names = []
+    while len(names) < 4:
+        name = misspell(rng, rng.choice(pool), rng.randrange(1, 3))
+        if normalize_name(name) not in {normalize_name(p) for p in pool}:
+            names.append(name)
+
+    details = assign_names(names, pool)
+    matches = [detail["match"] for detail in details if detail["match"]]
+    assert len(matches) == len(set(matches))
+    assert sum(detail["score"] or 0 for detail in details) == best_total(names, pool)
+    for name, detail in zip(names, details):
+        if detail["match"]:
+            assert detail["score"] == round(fuzz.ratio(name.lower(), detail["match"].lower()))
+
+
+def test_exact_names_are_paired_first(participants):
+    participants = participants[:6]
+    details = assign_names(["alice  TAN", "Alice Tan"], participants)
+    assert (details[0]["match"], details[0]["score"]) == ("Alice Tan", 100)
+    # The second copy loses its only candidate, and is told who took it
+    assert details[1]["match"] is None
+    assert (details[1]["runner_up"], details[1]["runner_up_score"]) == ("Alice Tan", 100)
+
+    # Alice Tan X -> Alice Tan (90) plus Alice Tan -> Alice Tang (95) would score higher
+    details = assign_names(["Alice Tan", "Alice Tan X"], ["Alice Tan", "Alice Tang"])
+    assert [detail["match"] for detail in details] == ["Alice Tan", None]
+
+    comparison, missing, _ = compare_names(["alice  TAN", "Alice Tan"], participants, one_to_one=True)
+    assert missing == ["Alice Tan"]
+    assert ("", "Bryan O'Neil") in comparison
@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+
+from w2m.event import EventNotFound, get_participant_names, parse_event_html
+from w2m.extract import HttpExtractor, fetch_event
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+EVENT_URL = "https://www.when2meet.com/?12345678-AbCdE"
+
+
+def read_fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class StubResponse:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class StubSession:
+    """Stands in for a requests session, answering every GET with one response."""
+
+    def __init__(self, response):
+        self.response = response
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append((url, timeout))
+        return self.response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def event():
+    return parse_event_html(read_fixture("when2meet_event.html"), EVENT_URL)
+
+
+def test_parse_people(event):
+    assert event.url == EVENT_URL
+    assert event.people_names == [
+        "Alice Tan", "Bryan O'Neil", "Chen Wei Ling", "Daniel Koh", "Esther Lim", "Farhan Ismail",
+    ]
+    assert event.people_ids == list(range(90112001, 90112007))
+
+
+def test_parse_slots(event):
+    assert len(event.slot_times) == 32
+    assert event.slot_times[:2] == [1736125200, 1736126100]
+    assert event.slot_times[-1] == 1736225100
+    assert len(event.available_at_slot) == len(event.slot_times)
+
+
+def test_parse_availability(event):
+    assert event.available_at_slot[0] == [90112001, 90112002, 90112004]
+    assert event.available_at_slot[12] == [90112002]
+    assert event.available_at_slot[13] == []
+    # Farhan Ismail is on the event but never marked any time
+    assert get_participant_names(event) == [
+        "Alice Tan", "Bryan O'Neil", "Chen Wei Ling", "Daniel Koh", "Esther Lim",
+    ]
+
+
+def test_parse_timezone(event):
+    assert event.timezone == "Asia/Singapore"
+
+
+def test_parse_escaped_names():
+    html = (
+        "<script>PeopleNames[0] = 'O\\'Brien';PeopleIDs[0] = 1;"
+        "PeopleNames[1] = \"Zo\\u00eb \\\"Z\\\"\";PeopleIDs[1] = 2;</script>"
+    )
+    assert parse_event_html(html).people_names == ["O'Brien", 'Zoë "Z"']
+
+
+def test_parse_missing_event():
+    event = parse_event_html(read_fixture("when2meet_missing_event.html"), EVENT_URL)
+    assert event.people_names == []
+    assert event.slot_times == []
+    assert event.timezone == ""
+
+
+def test_http_extractor_reads_event():
+    session = StubSession(StubResponse(200, read_fixture("when2meet_event.html")))
+    extractor = HttpExtractor(timeout=3, session=session)
+
+    event = fetch_event(EVENT_URL, extractor)
+
+    assert session.requested == [(EVENT_URL, 3)]
+    assert event.people_names[1] == "Bryan O'Neil"
+    assert len(event.slot_times) == 32
+
+
+def test_http_extractor_404_is_not_found():
+    extractor = HttpExtractor(session=StubSession(StubResponse(404, "Not Found")))
+    with pytest.raises(EventNotFound):
+        fetch_event(EVENT_URL, extractor)
+
+
+def test_http_extractor_missing_event_is_not_found():
+    page = read_fixture("when2meet_missing_event.html")
+    extractor = HttpExtractor(session=StubSession(StubResponse(200, page)))
+    with pytest.raises(EventNotFound):
+        fetch_event(EVENT_URL, extractor)
+
+
+def test_http_extractor_server_error_returns_none():
+    extractor = HttpExtractor(session=StubSession(StubResponse(500)))
+    assert fetch_event(EVENT_URL, extractor) is None
+
+
+def test_malformed_event_link_is_not_found():
+    session = StubSession(StubResponse(200, read_fixture("when2meet_event.html")))
+    with pytest.raises(EventNotFound):
+        fetch_event("https://www.when2meet.com/?oops", HttpExtractor(session=session))
+    assert session.requested == []
@@ -0,0 +1,106 @@
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from w2m.analysis import AvailabilityMatrix, get_participant_data
+from w2m.event import parse_event_html
+from w2m.snapshot import (
+    SNAPSHOT_COMPRESSED, SNAPSHOT_MAGIC, SNAPSHOT_MAX_BODY, SNAPSHOT_VERSION, SnapshotError,
+    dump_snapshot, load_snapshot,
+)
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+EVENT_URL = "https://www.when2meet.com/?10000001-Fixt"
+
+
+@pytest.fixture
+def event():
+    html = (FIXTURES / "when2meet_event.html").read_text(encoding="utf-8")
+    return parse_event_html(html, EVENT_URL)
+
+
+@pytest.fixture
+def snapshot(event):
+    return dump_snapshot(event)
+
+
+def header(flags=SNAPSHOT_COMPRESSED):
+    return SNAPSHOT_MAGIC + struct.pack("<BB", SNAPSHOT_VERSION, flags)
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip(event, compress):
+    loaded = load_snapshot(dump_snapshot(event, compress=compress))
+    assert loaded == event
+    assert np.array_equal(loaded.availability, AvailabilityMatrix(event).available)
+
+
+def test_round_trip_analysis(event, snapshot):
+    assert get_participant_data(load_snapshot(snapshot)) == get_participant_data(event)
+
+
+def test_saved_fixture_matches_page(event):
+    saved = (FIXTURES / "when2meet_event.w2ms").read_bytes()
+    assert load_snapshot(saved) == event
+    assert dump_snapshot(event) == saved
+
+
+def test_not_a_snapshot():
+    with pytest.raises(SnapshotError, match="Not a When2Meet snapshot"):
+        load_snapshot(b"<!DOCTYPE html>")
+    with pytest.raises(SnapshotError):
+        load_snapshot(b"")
+
+
+def test_unsupported_version(snapshot):
+    with pytest.raises(SnapshotError, match="Unsupported snapshot version"):
+        load_snapshot(SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION + 1]) + snapshot[5:])
+
+
+@pytest.mark.parametrize("cut", [7, 20, -1])
+def test_truncated(snapshot, cut):
+    with pytest.raises(SnapshotError, match="Corrupt snapshot"):
+        load_snapshot(snapshot[:cut])
+
+
+@pytest.mark.parametrize("cut", [7, 56, -1])
+def test_truncated_uncompressed(event, cut):
+    data = dump_snapshot(event, compress=False)
+    with pytest.raises(SnapshotError, match="Corrupt snapshot"):
+        load_snapshot(data[:cut])
+
+
+def test_trailing_data(event, snapshot):
+    with pytest.raises(SnapshotError, match="trailing data"):
+        load_snapshot(snapshot + b"\0")
+    with pytest.raises(SnapshotError, match="Corrupt snapshot"):
+        load_snapshot(dump_snapshot(event, compress=False) + b"\0")
+    body = zlib.decompress(snapshot[6:]) + b"extra"
+    with pytest.raises(SnapshotError, match="Corrupt snapshot"):
+        load_snapshot(header() + zlib.compress(body))
+
+
+def test_corrupt_compressed_body(snapshot):
+    with pytest.raises(SnapshotError, match="Corrupt snapshot"):
+        load_snapshot(header() + b"\xff" * 32)
+    flipped = bytearray(snapshot)
+    flipped[-6] ^= 0xFF
+    with pytest.raises(SnapshotError):
+        load_snapshot(bytes(flipped))
+
+
+def test_counts_larger_than_body():
+    # A header claiming a million names with no data behind it
+    body = struct.pack("<H", 0) + struct.pack("<H", 0) + struct.pack("<I", 1_000_000)
+    with pytest.raises(SnapshotError, match="Corrupt snapshot"):
+        load_snapshot(header(flags=0) + body)
+
+
+def test_decompression_is_capped():
+    bomb = header() + zlib.compress(b"\0" * (SNAPSHOT_MAX_BODY * 4), 9)
+    assert len(bomb) < SNAPSHOT_MAX_BODY // 100
+    with pytest.raises(SnapshotError, match="larger than"):
+        load_snapshot(bomb)
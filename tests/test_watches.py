@@ -0,0 +1,77 @@
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+import app as w2m_app
+from w2m.event import normalize_event_url, parse_event_html
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+EVENT_URL = "https://www.when2meet.com/?12345678-AbCdE"
+FARHAN = 90112006
+
+
+@pytest.fixture
+def event():
+    html = (FIXTURES / "when2meet_event.html").read_text(encoding="utf-8")
+    return parse_event_html(html, EVENT_URL)
+
+
+@pytest.fixture
+def page(monkeypatch, event):
+    """The event the stub extractor returns; replace page["event"] to change it."""
+    page = {"event": event}
+    monkeypatch.setattr(w2m_app, "_event_cache", None)
+    monkeypatch.setattr(w2m_app, "extract_event", lambda url, deadline=None: page["event"])
+    return page
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    store = w2m_app.WatchStore(str(tmp_path / "watches.db"))
+    return w2m_app.WatchScheduler(store, min_interval=60, max_interval=3600, concurrency=1)
+
+
+def poll_once(scheduler):
+    # Polls the event whether or not it is due yet
+    url_key = normalize_event_url(EVENT_URL)
+    with scheduler.store._connect() as db:
+        interval, fingerprint = db.execute(
+            "SELECT interval, fingerprint FROM watch_polls WHERE url_key = ?", (url_key,)
+        ).fetchone()
+    scheduler.poll(url_key, EVENT_URL, interval, fingerprint)
+
+
+def test_watch_sees_change_already_in_cache(page, scheduler):
+    store = scheduler.store
+    watch_id = store.create(
+        EVENT_URL, ["Alice Tan", "Farhan Ismail"], False, "Asia/Singapore", None,
+        ttl=3600, min_interval=60, max_active=10,
+    )
+    poll_once(scheduler)
+    assert store.get(watch_id)["state"]["missing_names"] == ["Farhan Ismail"]
+
+    # Farhan responds, and an ordinary check refreshes the cache before the next poll
+    slots = [list(pids) for pids in page["event"].available_at_slot]
+    slots[13].append(FARHAN)
+    page["event"] = replace(page["event"], available_at_slot=slots)
+    w2m_app.load_event(EVENT_URL, force_refresh=True)
+
+    poll_once(scheduler)
+    watch = store.get(watch_id)
+    assert watch["state"]["missing_names"] == []
+    assert watch["interval"] == 60
+    assert "complete" in store.events_since(watch_id)[-1][1]["reasons"]
+
+
+def test_unchanged_event_backs_off(page, scheduler):
+    store = scheduler.store
+    watch_id = store.create(
+        EVENT_URL, ["Alice Tan"], False, "Asia/Singapore", None,
+        ttl=3600, min_interval=60, max_active=10,
+    )
+    poll_once(scheduler)
+    assert store.get(watch_id)["interval"] == 60
+    poll_once(scheduler)
+    poll_once(scheduler)
+    assert store.get(watch_id)["interval"] == 240
@@ -0,0 +1,61 @@
+"""When2Meet event extraction and availability analysis, without the web app.
+
+    import w2m
+
+    event = w2m.load_snapshot(open("event.w2ms", "rb").read())
+    windows = w2m.rank_windows(event, w2m.WindowConstraints(min_minutes=60))
+
+Names are looked up in their submodule on first use, so `import w2m` stays
+cheap and NumPy, requests or Selenium are only imported by code that needs
+them. `python -m w2m` runs checks from the command line (see w2m.cli).
+"""
+import importlib
+
+_EXPORTS = {
+    "DEFAULT_TIMEZONE": "event",
+    "EVENT_NOT_FOUND_ERROR": "event",
+    "EventNotFound": "event",
+    "EventSnapshot": "event",
+    "check_event_url": "event",
+    "get_participant_names": "event",
+    "is_event_url": "event",
+    "normalize_event_url": "event",
+    "parse_event_html": "event",
+    "SnapshotError": "snapshot",
+    "dump_snapshot": "snapshot",
+    "load_snapshot": "snapshot",
+    "AvailabilityMatrix": "analysis",
+    "BlockFinder": "analysis",
+    "SlotClock": "analysis",
+    "WindowConstraints": "analysis",
+    "build_time_slots": "analysis",
+    "diff_events": "analysis",
+    "event_slot_page": "analysis",
+    "find_best_slots": "analysis",
+    "find_continuous_slots": "analysis",
+    "get_participant_data": "analysis",
+    "rank_windows": "analysis",
+    "update_participant_data": "analysis",
+    "NameMatcher": "matching",
+    "assign_names": "matching",
+    "compare_names": "matching",
+    "find_best_match": "matching",
+    "DriverPoolExhausted": "extract",
+    "fetch_event": "extract",
+    "make_extractor": "extract",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,5 @@
+import sys
+
+from w2m.cli import main
+
+sys.exit(main())
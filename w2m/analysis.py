@@ -0,0 +1,566 @@
+"""Availability analysis of When2Meet events: slot labels, best slots, windows."""
+import heapq
+import logging
+import re
+import traceback
+from collections import defaultdict
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import List
+
+import numpy as np
+import pytz
+
+from w2m.event import DEFAULT_TIMEZONE
+from w2m.matching import NameMatcher
+
+
+class SlotClock:
+    """Turns slot timestamps into local date and time labels for one IANA time zone.
+
+    UTC offsets are looked up once per UTC day (per slot only on days with a DST
+    change) and labels are cached, so each distinct string is formatted once.
+    """
+
+    def __init__(self, timezone):
+        self.timezone = timezone
+        self.tz = pytz.timezone(timezone)
+        self._date_labels = {}
+        self._time_labels = {}
+
+    def _offset(self, timestamp):
+        return int(datetime.fromtimestamp(int(timestamp), self.tz).utcoffset().total_seconds())
+
+    def local_seconds(self, timestamps):
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        days, inverse = np.unique(timestamps // 86400, return_inverse=True)
+        day_starts = np.array([self._offset(day * 86400) for day in days], dtype=np.int64)
+        day_ends = np.array([self._offset(day * 86400 + 86399) for day in days], dtype=np.int64)
+
+        offsets = day_starts[inverse]
+        for i in np.flatnonzero((day_starts != day_ends)[inverse]):
+            offsets[i] = self._offset(timestamps[i])
+        return timestamps + offsets
+
+    def date_label(self, local_day):
+        # e.g. "Mon, Jan 6"
+        label = self._date_labels.get(local_day)
+        if label is None:
+            date = datetime(1970, 1, 1) + timedelta(days=int(local_day))
+            label = self._date_labels[local_day] = f"{date.strftime('%a, %b')} {date.day}"
+        return label
+
+    def time_label(self, seconds):
+        # e.g. "9:15 AM"
+        label = self._time_labels.get(seconds)
+        if label is None:
+            hour, minute = divmod(int(seconds) // 60, 60)
+            label = self._time_labels[seconds] = \
+                f"{hour % 12 or 12}:{minute:02d} {'PM' if hour >= 12 else 'AM'}"
+        return label
+
+    def labels(self, timestamps):
+        """Return (date labels, time labels) for each timestamp."""
+        local_days, seconds = np.divmod(self.local_seconds(timestamps), 86400)
+        return (
+            [self.date_label(day) for day in local_days.tolist()],
+            [self.time_label(second) for second in seconds.tolist()],
+        )
+
+    def abbreviation(self, timestamp):
+        name = datetime.fromtimestamp(int(timestamp), self.tz).tzname()
+        return f"UTC{name}" if name[0] in "+-" else name
+
+
+class AvailabilityMatrix:
+    """Slots x people boolean availability matrix for one event."""
+
+    def __init__(self, event):
+        self.names = list(event.people_names)
+        self.timestamps = np.asarray(event.slot_times, dtype=np.int64)
+
+        if event.availability is not None:
+            self.available = event.availability
+        else:
+            self.available = self._from_id_lists(event)
+        self.counts = self.available.sum(axis=1)
+        if self.names:
+            self.percentages = self.counts * 100.0 / len(self.names)
+        else:
+            self.percentages = np.zeros(len(self.timestamps))
+
+    def _from_id_lists(self, event):
+        # Flatten the per-slot ID lists and map IDs to columns with one sorted search
+        slots = event.available_at_slot[:len(self.timestamps)]
+        lengths = np.fromiter((len(pids) for pids in slots), dtype=np.int64, count=len(slots))
+        flat = np.fromiter(chain.from_iterable(slots), dtype=np.int64, count=int(lengths.sum()))
+        rows = np.repeat(np.arange(len(slots)), lengths)
+
+        ids = np.asarray(event.people_ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        positions = np.minimum(np.searchsorted(ids[order], flat), max(len(ids) - 1, 0))
+        known = ids[order][positions] == flat if len(ids) else np.zeros(len(flat), dtype=bool)
+
+        available = np.zeros((len(self.timestamps), len(self.names)), dtype=bool)
+        available[rows[known], order[positions[known]]] = True
+        return available
+
+    def people_at(self, row):
+        return [self.names[col] for col in np.flatnonzero(self.available[row])]
+
+    def block_people(self, rows):
+        # People free for the whole block, else those free for at least 75% of it
+        block = self.available[rows]
+        present = block.sum(axis=0)
+        common = np.flatnonzero(present == len(rows))
+        if not len(common):
+            common = np.flatnonzero((present > 0) & (present >= int(len(rows) * 0.75)))
+        return [self.names[col] for col in common]
+
+
+def detect_slot_step(timestamps):
+    # Most common gap between consecutive slots, in seconds (When2Meet uses 15 minutes)
+    gaps = np.diff(np.sort(timestamps))
+    gaps = gaps[gaps > 0]
+    if not len(gaps):
+        return 900
+    values, counts = np.unique(gaps, return_counts=True)
+    return int(values[counts.argmax()])
+
+
+def slots_for(minutes, step):
+    # Whole slots needed to cover `minutes`, rounding partial slots up
+    return max(1, -(-minutes * 60 // step))
+
+
+class BlockFinder:
+    """Finds runs of consecutive slots where enough people are available.
+
+    Slots are sorted once. For every fallback threshold the length of the
+    qualifying run ending at each slot is precomputed, so any meeting length is
+    answered with one comparison and averaged with prefix sums.
+    """
+
+    THRESHOLDS = (50, 40, 30, 20)
+
+    def __init__(self, matrix, thresholds=THRESHOLDS):
+        self.matrix = matrix
+        self.order = np.argsort(matrix.timestamps, kind="stable")
+        timestamps = matrix.timestamps[self.order]
+        percentages = matrix.percentages[self.order]
+        self.step = detect_slot_step(timestamps)
+        self.thresholds = thresholds
+
+        index = np.arange(len(timestamps))
+        gap = np.ones(len(timestamps), dtype=bool)
+        gap[1:] = np.diff(timestamps) != self.step
+
+        self.run_lengths = []
+        for threshold in thresholds:
+            ok = percentages >= threshold
+            # A run restarts after a slot below the threshold or a gap in time
+            starts = np.where(~ok, index + 1, np.where(gap, index, 0))
+            self.run_lengths.append(index + 1 - np.maximum.accumulate(starts) if len(index) else index)
+        self.longest_runs = [int(run.max()) if len(run) else 0 for run in self.run_lengths]
+
+        self.count_sums = np.concatenate(([0], np.cumsum(matrix.counts[self.order])))
+        self.percentage_sums = np.concatenate(([0.0], np.cumsum(percentages)))
+
+    def slots_for(self, minutes):
+        return slots_for(minutes, self.step)
+
+    def find(self, minutes):
+        """Return (starts, length, avg counts, avg percentages) of every qualifying window.
+
+        Uses the highest threshold at which at least one window exists.
+        """
+        length = self.slots_for(minutes)
+        for run, longest in zip(self.run_lengths, self.longest_runs):
+            if longest >= length:
+                break
+        else:
+            return np.array([], dtype=int), length, np.array([]), np.array([])
+
+        ends = np.flatnonzero(run >= length) + 1
+        starts = ends - length
+        avg_counts = (self.count_sums[ends] - self.count_sums[starts]) / length
+        avg_percentages = (self.percentage_sums[ends] - self.percentage_sums[starts]) / length
+        return starts, length, avg_counts, avg_percentages
+
+    def rows(self, start, length):
+        return self.order[start:start + length]
+
+
+def diff_events(previous, current):
+    """Summarize what changed between two snapshots of the same event."""
+    def availability(event):
+        slots = defaultdict(set)
+        for timestamp, pids in zip(event.slot_times, event.available_at_slot):
+            for pid in pids:
+                slots[pid].add(timestamp)
+        return slots
+
+    previous_names, current_names = previous.name_by_id(), current.name_by_id()
+    previous_slots, current_slots = availability(previous), availability(current)
+    slots_changed = previous.slot_times != current.slot_times
+
+    changed_slots = 0
+    if not slots_changed:
+        changed_slots = sum(
+            set(before) != set(after)
+            for before, after in zip(previous.available_at_slot, current.available_at_slot)
+        )
+
+    return {
+        "added": [name for pid, name in current_names.items() if pid not in previous_names],
+        "removed": [name for pid, name in previous_names.items() if pid not in current_names],
+        "renamed": [
+            {"from": previous_names[pid], "to": name}
+            for pid, name in current_names.items()
+            if pid in previous_names and previous_names[pid] != name
+        ],
+        "changed": [
+            name
+            for pid, name in current_names.items()
+            if pid in previous_names and previous_slots[pid] != current_slots[pid]
+        ],
+        "slots_changed": slots_changed,
+        "changed_slots": changed_slots,
+    }
+
+
+def update_participant_data(previous_analysis, changes, event, timezone=DEFAULT_TIMEZONE):
+    """Re-analyze a refreshed event, reusing the previous analysis if nothing changed."""
+    if (changes["slots_changed"] or changes["added"] or changes["removed"] or changes["renamed"]
+            or changes["changed"] or changes["changed_slots"]
+            or previous_analysis.get("timezone") != timezone):
+        return get_participant_data(event, timezone)
+    return previous_analysis
+
+
+def build_time_slots(matrix, clock, rows=None):
+    """Return one dict per slot in `rows` (every slot by default), in that order."""
+    rows = np.arange(len(matrix.timestamps)) if rows is None else np.asarray(rows, dtype=np.int64)
+    dates, times = clock.labels(matrix.timestamps[rows])
+    return [
+        {
+            "time": time_label,
+            "date": date,
+            "available_people": matrix.people_at(row),
+            "num_available": int(matrix.counts[row]),
+            "timestamp": int(matrix.timestamps[row]),
+            "availability_percentage": float(matrix.percentages[row])
+        }
+        for row, date, time_label in zip(rows.tolist(), dates, times)
+    ]
+
+
+def find_best_slots(matrix, clock, limit=5):
+    # At least 70% of people available, most available first
+    best_rows = np.flatnonzero(matrix.percentages >= 70)
+    best_rows = best_rows[np.lexsort((matrix.timestamps[best_rows], -matrix.percentages[best_rows]))]
+    return build_time_slots(matrix, clock, best_rows[:limit])
+
+
+def find_continuous_slots(finder, clock, minutes, limit=5):
+    starts, length, avg_counts, avg_percentages = finder.find(minutes)
+    if not len(starts):
+        return []
+
+    # Only windows within rounding distance of the top `limit` can make the cut
+    cutoff = np.sort(avg_percentages)[-min(limit, len(starts))] - 0.1
+    candidates = np.flatnonzero(avg_percentages >= cutoff)
+    first_rows = finder.order[starts[candidates]]
+    last_rows = finder.order[starts[candidates] + length - 1]
+    dates, start_times = clock.labels(finder.matrix.timestamps[first_rows])
+    _, end_times = clock.labels(finder.matrix.timestamps[last_rows])
+
+    processed = []
+    for i, date, start_time, end_time in zip(candidates, dates, start_times, end_times):
+        processed.append({
+            "start_time": start_time,
+            "end_time": end_time,
+            "date": date,
+            "avg_available": round(float(avg_counts[i]), 1),
+            "avg_percentage": round(float(avg_percentages[i]), 1),
+            "available_people": finder.matrix.block_people(finder.rows(starts[i], length)),
+            "duration_minutes": length * finder.step // 60
+        })
+    return sorted(processed, key=lambda x: (-x["avg_percentage"], x["date"], x["start_time"]))[:limit]
+
+
+def get_participant_data(event, timezone=DEFAULT_TIMEZONE):
+    try:
+        # Get all participant names for comparison
+        all_participants = set(event.people_names)
+        matrix = AvailabilityMatrix(event)
+        clock = SlotClock(timezone)
+
+        # Slot entries are only built for the slots that are returned
+        total_slots = len(matrix.timestamps)
+        logging.info(f"Extracted {total_slots} time slots with availability")
+
+        # Find best time slots (at least 70% of people available), most available first
+        best_slots = find_best_slots(matrix, clock)
+
+        if total_slots:
+            max_availability = int(matrix.counts.max())
+            avg_availability = float(matrix.counts.mean())
+        else:
+            max_availability = 0
+            avg_availability = 0
+
+        finder = BlockFinder(matrix)
+
+        continuous_slots = {
+            "one_hour": find_continuous_slots(finder, clock, 60),
+            "two_hour": find_continuous_slots(finder, clock, 120),
+            "three_hour": find_continuous_slots(finder, clock, 180)
+        }
+
+        analysis = {
+            "best_slots": best_slots,
+            "continuous_slots": continuous_slots,  # Add this new field
+            "total_slots": total_slots,
+            "timezone": timezone,
+            "timezone_abbr": clock.abbreviation(event.slot_times[0]) if event.slot_times else timezone,
+            "max_availability": max_availability,
+            "avg_availability": avg_availability,
+            "all_participants": list(all_participants)
+        }
+
+        # In get_participant_data function, after processing the blocks:
+        logging.debug(f"Generated continuous slots:")
+        logging.debug(f"One hour blocks: {len(continuous_slots['one_hour'])}")
+        logging.debug(f"Two hour blocks: {len(continuous_slots['two_hour'])}")
+        logging.debug(f"Three hour blocks: {len(continuous_slots['three_hour'])}")
+
+        return analysis
+
+    except Exception as e:
+        logging.error(f"An error occurred: {str(e)}")
+        logging.error(traceback.format_exc())
+        return None
+
+
+SLOT_PAGE_DAYS = 7
+SLOT_PAGE_MAX_DAYS = 31
+SLOT_PEOPLE_FORMATS = ("indices", "bitmask", "none")
+
+
+def event_slot_page(event, timezone=DEFAULT_TIMEZONE, start_day=0, days=SLOT_PAGE_DAYS,
+                    people="indices"):
+    """Return the slots on a range of local days in a compact, columnar form.
+
+    Each slot refers to the page's `days` and `times` labels by index. People are
+    indices into `names`, or hex bitmasks of little-endian bytes where bit i is
+    names[i]; "none" leaves them out for callers that only need the counts.
+    """
+    matrix = AvailabilityMatrix(event)
+    clock = SlotClock(timezone)
+    order = np.argsort(matrix.timestamps, kind="stable")
+    local_days, seconds = np.divmod(clock.local_seconds(matrix.timestamps[order]), 86400)
+    all_days, day_index = np.unique(local_days, return_inverse=True)
+    all_seconds, time_index = np.unique(seconds, return_inverse=True)
+
+    end_day = min(start_day + days, len(all_days))
+    on_page = (day_index >= start_day) & (day_index < end_day)
+    rows = order[on_page]
+
+    slots = {
+        "timestamp": matrix.timestamps[rows].tolist(),
+        "day": day_index[on_page].tolist(),
+        "time": time_index[on_page].tolist(),
+        "count": matrix.counts[rows].tolist(),
+        "percentage": np.round(matrix.percentages[rows], 1).tolist(),
+    }
+    if people == "indices":
+        slots["people"] = [np.flatnonzero(matrix.available[row]).tolist() for row in rows]
+    elif people == "bitmask":
+        packed = np.packbits(matrix.available[rows], axis=1, bitorder="little")
+        slots["people"] = [bits.tobytes().hex() for bits in packed]
+
+    return {
+        "names": matrix.names,
+        "timezone": timezone,
+        "timezone_abbr": clock.abbreviation(event.slot_times[0]) if event.slot_times else timezone,
+        "days": [clock.date_label(day) for day in all_days.tolist()],
+        "times": [clock.time_label(second) for second in all_seconds.tolist()],
+        "start_day": min(start_day, end_day),
+        "end_day": end_day,
+        "slots": slots,
+    }
+
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+WEEKDAY_NUMBERS = dict(
+    [(name, i) for i, name in enumerate(WEEKDAYS)] + [(name[:3], i) for i, name in enumerate(WEEKDAYS)]
+)
+WINDOW_MAX_LIMIT = 50
+
+
+def _time_of_day(value, name):
+    # "HH:MM" to seconds after midnight; "24:00" is allowed as the end of the day
+    match = re.fullmatch(r"(\d{1,2}):(\d{2})", value) if isinstance(value, str) else None
+    hours, minutes = (int(match.group(1)), int(match.group(2))) if match else (0, 60)
+    if minutes >= 60 or hours * 60 + minutes > 1440:
+        raise ValueError(f"'{name}' must be a time of day like \"09:30\".")
+    return (hours * 60 + minutes) * 60
+
+
+@dataclass
+class WindowConstraints:
+    """What a recommended meeting window has to satisfy.
+
+    Times of day are local to the requested time zone. `excluded_days` takes
+    weekday names ("sat", "Sunday") or dates ("2025-01-06").
+    """
+
+    min_minutes: int = 60
+    max_minutes: int = 60
+    earliest: str = "00:00"
+    latest: str = "24:00"
+    required: List[str] = field(default_factory=list)
+    min_attendance: int = 0
+    excluded_days: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        for name in ("min_minutes", "max_minutes", "min_attendance"):
+            value = getattr(self, name)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise ValueError(f"'{name}' must be a whole number >= 0.")
+        if not 0 < self.min_minutes <= self.max_minutes <= 1440:
+            raise ValueError("Durations must satisfy 0 < min_minutes <= max_minutes <= 1440.")
+        self.earliest_seconds = _time_of_day(self.earliest, "earliest")
+        self.latest_seconds = _time_of_day(self.latest, "latest")
+        if self.earliest_seconds >= self.latest_seconds:
+            raise ValueError("'earliest' must be before 'latest'.")
+        for name in ("required", "excluded_days"):
+            value = getattr(self, name)
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError(f"'{name}' must be a list of strings.")
+
+        self.excluded_weekdays = set()
+        self.excluded_dates = set()
+        for day in self.excluded_days:
+            key = day.strip().lower()
+            if key in WEEKDAY_NUMBERS:
+                self.excluded_weekdays.add(WEEKDAY_NUMBERS[key])
+            else:
+                try:
+                    self.excluded_dates.add(datetime.strptime(key, "%Y-%m-%d").date())
+                except ValueError:
+                    raise ValueError(f"Unknown day in 'excluded_days': {day}")
+
+    @classmethod
+    def from_json(cls, data):
+        if not isinstance(data, dict):
+            raise ValueError("'constraints' must be an object.")
+        unknown = set(data) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown constraints: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def required_columns(self, matrix):
+        matcher = NameMatcher(matrix.names)
+        matches = [matcher.match(name) for name in self.required]
+        missing = [name for name, match in zip(self.required, matches) if not match]
+        if missing:
+            raise ValueError(f"Required attendees not in this event: {', '.join(missing)}")
+        return [matrix.names.index(match) for match in matches]
+
+    def allows_days(self, local_days):
+        # Day 0 of the epoch was a Thursday
+        allowed = {}
+        for day in np.unique(local_days).tolist():
+            date = (datetime(1970, 1, 1) + timedelta(days=day)).date()
+            allowed[day] = (day + 3) % 7 not in self.excluded_weekdays \
+                and date not in self.excluded_dates
+        return np.array([allowed[day] for day in local_days.tolist()], dtype=bool)
+
+
+def rank_windows(event, constraints, timezone=DEFAULT_TIMEZONE, limit=5):
+    """Return the best `limit` non-overlapping windows that meet `constraints`.
+
+    Every slot is checked once against the constraints and turned into run
+    lengths, so each duration's candidate windows and their average attendance
+    come from prefix sums. Durations are rounded up to whole slots, like
+    BlockFinder. Each duration's candidates are sorted best first (higher
+    average, then earlier), and a heap holding the next candidate of each
+    duration merges them (longer first on ties) until `limit` windows that
+    don't overlap have been chosen.
+    """
+    matrix = AvailabilityMatrix(event)
+    if not len(matrix.timestamps):
+        return []
+    clock = SlotClock(timezone)
+    order = np.argsort(matrix.timestamps, kind="stable")
+    timestamps = matrix.timestamps[order]
+    counts = matrix.counts[order]
+    step = detect_slot_step(timestamps)
+    local_days, seconds = np.divmod(clock.local_seconds(timestamps), 86400)
+
+    ok = (seconds >= constraints.earliest_seconds) & (seconds + step <= constraints.latest_seconds)
+    ok &= counts >= constraints.min_attendance
+    ok &= constraints.allows_days(local_days)
+    required = constraints.required_columns(matrix)
+    if required:
+        ok &= matrix.available[order][:, required].all(axis=1)
+
+    # Length of the run of acceptable, back-to-back slots on one day ending at each slot
+    index = np.arange(len(timestamps))
+    breaks = np.ones(len(timestamps), dtype=bool)
+    breaks[1:] = (np.diff(timestamps) != step) | (np.diff(local_days) != 0)
+    run = index + 1 - np.maximum.accumulate(np.where(~ok, index + 1, np.where(breaks, index, 0)))
+    count_sums = np.concatenate(([0], np.cumsum(counts)))
+
+    lengths = range(
+        slots_for(constraints.min_minutes, step), slots_for(constraints.max_minutes, step) + 1
+    )
+    ranked = []
+    for length in lengths:
+        ends = np.flatnonzero(run >= length) + 1
+        starts = ends - length
+        averages = (count_sums[ends] - count_sums[starts]) / length
+        best = np.lexsort((starts, -averages))
+        if len(best):
+            ranked.append((length, -averages[best], starts[best]))
+
+    # The heap only ever holds one candidate per duration
+    heap = [
+        (float(negative_averages[0]), -length, int(starts[0]), i, 0)
+        for i, (length, negative_averages, starts) in enumerate(ranked)
+    ]
+    heapq.heapify(heap)
+    chosen = []
+    while heap and len(chosen) < limit:
+        _, negative_length, start, i, position = heapq.heappop(heap)
+        _, negative_averages, starts = ranked[i]
+        if position + 1 < len(starts):
+            heapq.heappush(heap, (
+                float(negative_averages[position + 1]), negative_length,
+                int(starts[position + 1]), i, position + 1,
+            ))
+        end = start - negative_length
+        if all(end <= other_start or other_end <= start for other_start, other_end in chosen):
+            chosen.append((start, end))
+
+    windows = []
+    for start, end in chosen:
+        rows = order[start:end]
+        window_counts = matrix.counts[rows]
+        everyone = np.flatnonzero(matrix.available[rows].all(axis=0))
+        windows.append({
+            "date": clock.date_label(int(local_days[start])),
+            "start_time": clock.time_label(int(seconds[start])),
+            "end_time": clock.time_label((int(seconds[end - 1]) + step) % 86400),
+            "start_timestamp": int(timestamps[start]),
+            "end_timestamp": int(timestamps[end - 1]) + step,
+            "duration_minutes": (end - start) * step // 60,
+            "avg_available": round(float(window_counts.mean()), 1),
+            "avg_percentage": round(float(matrix.percentages[rows].mean()), 1),
+            "min_available": int(window_counts.min()),
+            "available_people": [matrix.names[col] for col in everyone],
+        })
+    return windows
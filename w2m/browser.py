@@ -0,0 +1,267 @@
+"""The Selenium backend: event pages rendered in headless Firefox."""
+import json
+import logging
+import queue
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+
+from w2m.event import EventNotFound, EventSnapshot
+from w2m.extract import DriverPoolExhausted
+from w2m.metrics import DRIVER_POOL_TIMEOUTS, DRIVER_POOL_WAITS, timed
+
+EXTRACT_SCRIPT = """
+var result = {
+    PeopleNames: window.PeopleNames || [],
+    PeopleIDs: window.PeopleIDs || [],
+    AvailableAtSlot: window.AvailableAtSlot || [],
+    TimeOfSlot: window.TimeOfSlot || [],
+    TimeZone: ''
+};
+
+var tzSelect = document.getElementById('ParticipantTimeZone');
+if (tzSelect) {
+    result.TimeZone = tzSelect.options[tzSelect.selectedIndex].text;
+}
+
+return JSON.stringify(result);
+"""
+
+# Inline scripts have all run once the document leaves "loading"
+READY_SCRIPT = """
+if (window.location.href === 'about:blank' || document.readyState === 'loading') {
+    return 'loading';
+}
+return window.TimeOfSlot && window.TimeOfSlot.length ? 'ready' : 'missing';
+"""
+
+
+class DriverPool:
+    """Bounded set of warm headless Firefox drivers shared by a worker's threads."""
+
+    def __init__(self, size, checkout_timeout, max_uses):
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.max_uses = max_uses
+        self._idle = queue.LifoQueue()
+        self._capacity = threading.BoundedSemaphore(size)
+        self._uses = {}
+        self._lock = threading.Lock()
+
+    def _launch(self):
+        options = Options()
+        options.add_argument("-headless")
+        # driver.get returns at once; wait_for_event_data decides when the page is usable
+        options.set_capability("pageLoadStrategy", "none")
+        logging.info("Starting Firefox in headless mode")
+        with timed("driver_launch"):
+            driver = webdriver.Firefox(options=options)
+        with self._lock:
+            self._uses[driver] = 0
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(driver, None)
+        try:
+            logging.info("Closing the browser")
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _acquire(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return self._launch()
+            if self._is_healthy(driver):
+                return driver
+            logging.warning("Discarding unresponsive browser")
+            self._discard(driver)
+
+    def _release(self, driver):
+        with self._lock:
+            self._uses[driver] += 1
+            uses = self._uses[driver]
+        if uses >= self.max_uses:
+            logging.info(f"Recycling browser after {uses} uses")
+            self._discard(driver)
+            return
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except WebDriverException:
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        # Wait for a free driver instead of starting more Firefox processes
+        if not self._capacity.acquire(blocking=False):
+            DRIVER_POOL_WAITS.inc()
+            wait = self.checkout_timeout if timeout is None else min(self.checkout_timeout, timeout)
+            with timed("driver_wait"):
+                acquired = self._capacity.acquire(timeout=wait)
+            if not acquired:
+                DRIVER_POOL_TIMEOUTS.inc()
+                raise DriverPoolExhausted(f"No browser available after {wait}s")
+        driver = None
+        try:
+            driver = self._acquire()
+            yield driver
+        except WebDriverException as e:
+            # A browser that errored may be wedged; one that only timed out on a slow
+            # page, or any other failure (EventNotFound included), goes back to the pool
+            if driver is not None and not isinstance(e, TimeoutException):
+                self._discard(driver)
+                driver = None
+            raise
+        finally:
+            if driver is not None:
+                self._release(driver)
+            self._capacity.release()
+
+    def warm(self):
+        # Pre-launch drivers up to the pool size so early requests skip startup
+        while len(self._uses) < self.size and self._capacity.acquire(blocking=False):
+            try:
+                self._idle.put(self._launch())
+            except Exception as e:
+                logging.error(f"Could not pre-launch browser: {str(e)}")
+                break
+            finally:
+                self._capacity.release()
+        logging.info(f"Browser pool warmed with {self._idle.qsize()} idle drivers")
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+class AdaptiveTimeout:
+    """A timeout that follows how long recent successful waits took.
+
+    It starts at the ceiling and settles at `factor` times the moving average,
+    so slow pages still get room while dead ones give up quickly.
+    """
+
+    def __init__(self, floor, ceiling, factor=4, smoothing=0.2):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.factor = factor
+        self.smoothing = smoothing
+        self._average = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        if self._average is None:
+            return self.ceiling
+        return min(self.ceiling, max(self.floor, self.factor * self._average))
+
+    def observe(self, seconds):
+        with self._lock:
+            if self._average is None:
+                self._average = seconds
+            else:
+                self._average += self.smoothing * (seconds - self._average)
+
+
+def wait_for_event_data(driver, url, timeout, limit=None):
+    """Poll until the page's data globals exist, then stop loading everything else.
+
+    Waits for `timeout.current()` seconds, or `limit` if that is shorter.
+    """
+    started = time.perf_counter()
+
+    def settled(driver):
+        state = driver.execute_script(READY_SCRIPT)
+        return state if state != "loading" else False
+
+    wait = timeout.current() if limit is None else min(timeout.current(), limit)
+    state = WebDriverWait(driver, wait, poll_frequency=0.1).until(settled)
+    # Images, fonts and trackers aren't needed once the inline scripts have run
+    driver.execute_script("window.stop();")
+    if state == "missing":
+        raise EventNotFound(f"No time slots found on {url}")
+    timeout.observe(time.perf_counter() - started)
+
+
+class SeleniumExtractor:
+    """Renders event pages in a pool of headless Firefox drivers."""
+
+    name = "selenium"
+
+    def __init__(self, pool_size=2, checkout_timeout=30, max_uses=50, ready_timeout_min=3,
+                 ready_timeout_max=15):
+        self.pool = DriverPool(pool_size, checkout_timeout, max_uses)
+        self.ready_timeout = AdaptiveTimeout(ready_timeout_min, ready_timeout_max)
+
+    def extract(self, url, timeout=None):
+        # `timeout` bounds the wait for a browser and for the page's data
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            with self.pool.checkout(timeout) as driver:
+                return self._read_event(driver, url, deadline)
+        except (EventNotFound, DriverPoolExhausted):
+            raise
+        except Exception as e:
+            logging.error(f"An error occurred: {str(e)}")
+            logging.error(f"Traceback: {traceback.format_exc()}")
+            return None
+
+    def _read_event(self, driver, url, deadline=None):
+        logging.info(f"Navigating to URL: {url}")
+        with timed("page_load"):
+            driver.get(url)
+        logging.info("Waiting for event data")
+
+        with timed("wait_for_globals"):
+            limit = None if deadline is None else max(0, deadline - time.monotonic())
+            wait_for_event_data(driver, url, self.ready_timeout, limit)
+
+        logging.debug(f"Page title: {driver.title}")
+        logging.debug(f"Page URL: {driver.current_url}")
+
+        with timed("script_execute"):
+            payload = driver.execute_script(EXTRACT_SCRIPT)
+        with timed("json_parse"):
+            result = json.loads(payload)
+
+        event = EventSnapshot(
+            url=url,
+            people_names=result["PeopleNames"],
+            people_ids=result["PeopleIDs"],
+            slot_times=result["TimeOfSlot"],
+            available_at_slot=result["AvailableAtSlot"],
+            timezone=result["TimeZone"],
+        )
+
+        logging.info(
+            f"Extracted {len(event.people_ids)} people and "
+            f"{len(event.slot_times)} time slots (timezone: {event.timezone})"
+        )
+        return event
+
+    def warm(self):
+        self.pool.warm()
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,242 @@
+"""Check rosters against When2Meet events from the command line.
+
+    python -m w2m --names roster.txt https://www.when2meet.com/?123-abc saved.w2ms page.html
+    python -m w2m --format csv --table windows --workers 8 @events.txt > windows.csv
+
+Each source is an event URL, a .w2ms snapshot or a saved event page, and
+`@file` reads more sources from a file, one per line. Sources are checked in a
+pool of processes and reported in the order given, as one JSON document like
+/batch returns or as a CSV table of name matches or recommended windows. The
+exit status is 1 if any source failed.
+"""
+import argparse
+import atexit
+import csv
+import json
+import logging
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pytz
+
+from w2m.analysis import WINDOW_MAX_LIMIT, AvailabilityMatrix, WindowConstraints, rank_windows
+from w2m.event import (
+    DEFAULT_TIMEZONE, EVENT_NOT_FOUND_ERROR, EventNotFound, get_participant_names,
+    is_event_url, parse_event_html,
+)
+from w2m.extract import BACKENDS, fetch_event, make_extractor
+from w2m.matching import compare_names
+from w2m.snapshot import SNAPSHOT_MAGIC, load_snapshot
+
+COMPARISON_COLUMNS = ["source", "name", "match", "status", "error"]
+WINDOW_COLUMNS = [
+    "source", "rank", "date", "start_time", "end_time", "start_timestamp", "end_timestamp",
+    "duration_minutes", "avg_available", "avg_percentage", "min_available", "available_people",
+    "error",
+]
+
+_extractor = None
+_extractor_config = ("http", {})
+
+
+def init_worker(backend, options):
+    global _extractor_config
+    _extractor_config = (backend, options)
+
+
+def get_extractor():
+    # One per process, created by the first URL so runs over saved files never start one
+    global _extractor
+    if _extractor is None:
+        backend, options = _extractor_config
+        _extractor = make_extractor(backend, **options)
+        atexit.register(_extractor.close)
+    return _extractor
+
+
+def read_event(source):
+    """Load the event behind `source`: a URL, a .w2ms snapshot or a saved event page."""
+    if is_event_url(source):
+        event = fetch_event(source, get_extractor())
+        if event is None:
+            raise ValueError("Could not extract time slots from When2Meet.")
+        return event
+
+    with open(source, "rb") as f:
+        data = f.read()
+    if data.startswith(SNAPSHOT_MAGIC):
+        return load_snapshot(data)
+    event = parse_event_html(data.decode("utf-8", errors="replace"))
+    if not event.slot_times:
+        raise ValueError(f"No When2Meet event data in {source}")
+    return event
+
+
+def check_source(source, names_list, timezone=DEFAULT_TIMEZONE, one_to_one=False,
+                 constraints=None, limit=5):
+    """Compare `names_list` against one source and rank its windows, like a /batch entry."""
+    result = {"source": source}
+    try:
+        event = read_event(source)
+        participant_names = get_participant_names(event)
+        comparison, missing_names, match_details = compare_names(
+            names_list, participant_names, one_to_one=one_to_one
+        )
+        windows = rank_windows(event, constraints or WindowConstraints(), timezone, limit)
+        matrix = AvailabilityMatrix(event)
+    except EventNotFound:
+        result.update(status="error", error=EVENT_NOT_FOUND_ERROR)
+        return result
+    except (OSError, ValueError) as e:
+        # Unreadable files, corrupt snapshots and required attendees missing from the event
+        result.update(status="error", error=str(e))
+        return result
+    except Exception as e:
+        logging.error(f"Check failed for {source}: {str(e)}")
+        logging.error(traceback.format_exc())
+        result.update(status="error", error="An error occurred while processing this event.")
+        return result
+
+    result.update(
+        status="ok",
+        url=event.url,
+        timezone=timezone,
+        respondents=len(participant_names),
+        comparison=comparison,
+        missing_names=missing_names,
+        match_details=match_details,
+        windows=windows,
+        availability_stats={
+            "total_slots": len(matrix.timestamps),
+            "max_availability": int(matrix.counts.max()) if len(matrix.counts) else 0,
+            "avg_availability": float(matrix.counts.mean()) if len(matrix.counts) else 0,
+        },
+    )
+    return result
+
+
+def run_checks(sources, check, workers=1, backend="http", extractor_options=None):
+    """Run `check` over `sources` in order, in a process pool when `workers` > 1."""
+    extractor_options = extractor_options or {}
+    if workers <= 1 or len(sources) <= 1:
+        init_worker(backend, extractor_options)
+        return [check(source) for source in sources]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(backend, extractor_options)
+    ) as executor:
+        return list(executor.map(check, sources, chunksize=max(1, len(sources) // (workers * 4))))
+
+
+def comparison_rows(results):
+    for result in results:
+        if result["status"] != "ok":
+            yield {"source": result["source"], "error": result["error"]}
+            continue
+        for name, match in result["comparison"]:
+            # Unmatched When2Meet respondents come last, with no roster name
+            status = "matched" if name and match else "missing" if name else "not_on_roster"
+            yield {"source": result["source"], "name": name, "match": match, "status": status}
+
+
+def window_rows(results):
+    for result in results:
+        if result["status"] != "ok":
+            yield {"source": result["source"], "error": result["error"]}
+            continue
+        for rank, window in enumerate(result["windows"], 1):
+            yield dict(
+                window, source=result["source"], rank=rank,
+                available_people="; ".join(window["available_people"]),
+            )
+
+
+def write_csv(results, table, out):
+    columns, rows = (
+        (COMPARISON_COLUMNS, comparison_rows(results)) if table == "comparison"
+        else (WINDOW_COLUMNS, window_rows(results))
+    )
+    writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def read_names(path):
+    if path == "-":
+        lines = sys.stdin.read().split("\n")
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+    return [name.strip() for name in lines if name.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m w2m", description=__doc__.split("\n")[0], fromfile_prefix_chars="@"
+    )
+    parser.add_argument("sources", nargs="+",
+                        help="event URLs, .w2ms snapshots or saved event pages; @file reads "
+                             "more, one per line")
+    parser.add_argument("--names", help="roster file, one name per line ('-' for stdin)")
+    parser.add_argument("--name", action="append", default=[], help="a roster name; repeatable")
+    parser.add_argument("--one-to-one", action="store_true",
+                        help="match each When2Meet name to at most one roster name")
+    parser.add_argument("--timezone", default=DEFAULT_TIMEZONE)
+    parser.add_argument("--constraints", default="{}",
+                        help="window constraints as JSON, as for POST /events/windows")
+    parser.add_argument("--windows", type=int, default=5, help="windows to report per event")
+    parser.add_argument("--backend", choices=BACKENDS, default="http",
+                        help="how event URLs are read (default: http)")
+    parser.add_argument("--http-timeout", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes to check sources in (default: one per CPU)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--table", choices=("comparison", "windows"), default="comparison",
+                        help="which results --format csv writes")
+    parser.add_argument("--output", help="write here instead of stdout")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log each fetch and parse")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    if args.timezone not in pytz.all_timezones_set:
+        parser.error(f"unknown time zone: {args.timezone}")
+    if not 1 <= args.windows <= WINDOW_MAX_LIMIT:
+        parser.error(f"--windows must be between 1 and {WINDOW_MAX_LIMIT}")
+    try:
+        constraints = WindowConstraints.from_json(json.loads(args.constraints))
+    except ValueError as e:
+        parser.error(f"--constraints: {str(e)}")
+    names_list = args.name + (read_names(args.names) if args.names else [])
+
+    if args.backend == "selenium":
+        # Each process runs its own browser
+        extractor_options = {"pool_size": 1}
+    else:
+        extractor_options = {"timeout": args.http_timeout}
+    check = partial(
+        check_source, names_list=names_list, timezone=args.timezone,
+        one_to_one=args.one_to_one, constraints=constraints, limit=args.windows,
+    )
+    results = run_checks(
+        args.sources, check, workers=args.workers, backend=args.backend,
+        extractor_options=extractor_options,
+    )
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(results, args.table, out)
+        else:
+            json.dump({"results": results}, out, indent=2)
+            out.write("\n")
+    finally:
+        if args.output:
+            out.close()
+
+    failed = sum(result["status"] != "ok" for result in results)
+    if failed:
+        logging.warning(f"{failed} of {len(results)} sources failed")
+    return 1 if failed else 0
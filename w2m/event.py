@@ -0,0 +1,142 @@
+"""Event data as read from a When2Meet page, and parsing a saved page."""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_TIMEZONE = "Asia/Singapore"
+
+
+@dataclass
+class EventSnapshot:
+    """Raw data read from a When2Meet event page in a single page load."""
+
+    url: str
+    people_names: List[str]
+    people_ids: List[int]
+    slot_times: List[int]
+    available_at_slot: List[List[int]]
+    timezone: str = ""
+    # Slots x people matrix when loaded from a binary snapshot, so it isn't rebuilt
+    availability: Optional["np.ndarray"] = field(default=None, repr=False, compare=False)
+
+    def name_by_id(self):
+        return dict(zip(self.people_ids, self.people_names))
+
+
+class EventNotFound(Exception):
+    """The URL is not a live When2Meet event, e.g. a typo or a deleted event."""
+
+
+EVENT_NOT_FOUND_ERROR = "That When2Meet event doesn't exist or has been deleted. Check the link."
+EVENT_QUERY_RE = re.compile(r"\d+-\w+")
+
+
+def check_event_url(url):
+    # When2Meet event links look like https://www.when2meet.com/?12345678-AbCdE
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host.endswith("when2meet.com") and not EVENT_QUERY_RE.fullmatch(parts.query):
+        raise EventNotFound(f"{url} is not a When2Meet event link")
+
+
+def is_event_url(url, hosts=None):
+    """Whether `url` is an http(s) URL, and if `hosts` is given, on one of them or a subdomain."""
+    parts = urlsplit(url) if isinstance(url, str) else None
+    if not (parts and parts.scheme in ("http", "https") and parts.netloc):
+        return False
+    if hosts is None:
+        return True
+    host = (parts.hostname or "").lower()
+    return any(host == allowed or host.endswith(f".{allowed}") for allowed in hosts)
+
+
+JS_STRING = r"'((?:[^'\\]|\\.)*)'" + r'|"((?:[^"\\]|\\.)*)"'
+PEOPLE_NAME_RE = re.compile(r"PeopleNames\[(\d+)\]\s*=\s*(?:" + JS_STRING + ")")
+PEOPLE_ID_RE = re.compile(r"PeopleIDs\[(\d+)\]\s*=\s*(\d+)")
+TIME_OF_SLOT_RE = re.compile(r"TimeOfSlot\[(\d+)\]\s*=\s*(\d+)")
+AVAILABLE_AT_SLOT_RE = re.compile(r"AvailableAtSlot\[(\d+)\]\.push\((\d+)\)")
+JS_ESCAPE_RE = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)")
+
+
+def _unescape_js(value):
+    def replace(match):
+        escape = match.group(1)
+        if escape[0] in "ux" and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return {"n": "\n", "t": "\t", "r": "\r"}.get(escape, escape)
+
+    return JS_ESCAPE_RE.sub(replace, value)
+
+
+def _indexed(matches, convert):
+    values = {}
+    for index, value in matches:
+        values[int(index)] = convert(value)
+    return [values[i] for i in sorted(values)]
+
+
+def parse_event_html(html, url=""):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    script = "\n".join(tag.string or "" for tag in soup.find_all("script"))
+
+    people_names = _indexed(
+        ((m.group(1), _unescape_js(m.group(2) if m.group(2) is not None else m.group(3)))
+         for m in PEOPLE_NAME_RE.finditer(script)),
+        str,
+    )
+    people_ids = _indexed(PEOPLE_ID_RE.findall(script), int)
+    slot_times = _indexed(TIME_OF_SLOT_RE.findall(script), int)
+
+    available_at_slot = [[] for _ in slot_times]
+    for index, pid in AVAILABLE_AT_SLOT_RE.findall(script):
+        index = int(index)
+        if index < len(available_at_slot):
+            available_at_slot[index].append(int(pid))
+
+    timezone = ""
+    tz_select = soup.find("select", id="ParticipantTimeZone")
+    if tz_select:
+        selected = tz_select.find("option", selected=True) or tz_select.find("option")
+        if selected:
+            timezone = selected.get_text(strip=True)
+
+    return EventSnapshot(
+        url=url,
+        people_names=people_names,
+        people_ids=people_ids,
+        slot_times=slot_times,
+        available_at_slot=available_at_slot,
+        timezone=timezone,
+    )
+
+
+def get_participant_names(event):
+    # Create a set of IDs for people who have specified availability
+    available_ids = set()
+    for slot in event.available_at_slot:
+        available_ids.update(slot)
+
+    # Filter out names of people who haven't specified any availability
+    participant_names = [
+        name for name, id in zip(event.people_names, event.people_ids)
+        if id in available_ids
+    ]
+
+    logging.info(f"Extracted {len(participant_names)} participant names with availability")
+    return participant_names
+
+
+def normalize_event_url(url):
+    # http/https, "www." and fragments don't change which event is loaded
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path or '/'}?{parts.query}"
@@ -0,0 +1,144 @@
+"""Reading events from When2Meet pages, with a choice of backend.
+
+The "http" backend fetches the page and parses its inline scripts. The
+"selenium" backend renders it in headless Firefox; it lives in w2m.browser and
+Selenium is only imported when that backend is created.
+"""
+import logging
+import threading
+import time
+import traceback
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from w2m.event import EventNotFound, check_event_url, parse_event_html
+from w2m.metrics import EVENTS_NOT_FOUND, SCRAPE_FAILURES, timed
+
+BACKENDS = ("http", "selenium")
+USER_AGENT = "Mozilla/5.0 (compatible; when2meet-checker)"
+RETRIES = 2
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = (502, 503, 504)
+# Seconds urllib3 sleeps between attempts when every retry is used
+RETRY_SLEEP = sum(RETRY_BACKOFF * 2 ** (n - 1) for n in range(2, RETRIES + 1))
+
+
+class DriverPoolExhausted(Exception):
+    pass
+
+
+def make_http_session(pool_size=10):
+    # Pooled so keep-alive connections are reused across fetches
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=RETRIES, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+class HttpExtractor:
+    """Reads the event data straight from the page's inline scripts."""
+
+    name = "http"
+
+    def __init__(self, timeout=10, pool_size=10, session=None, per_host=8):
+        self.timeout = timeout
+        self.session = session or make_http_session(pool_size)
+        # Fetches in flight to any one host, however many threads are checking events
+        self.per_host = per_host
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+    def _host_slot(self, host):
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def extract(self, url, timeout=None):
+        # `timeout` is a total budget, e.g. a job's remaining time. Waiting for a turn at
+        # the host comes out of it, and each attempt waits up to its own timeout, so what
+        # is left is split across the retries.
+        started = time.monotonic()
+        host = (urlsplit(url).hostname or "").lower()
+        slot = self._host_slot(host)
+        try:
+            logging.info(f"Fetching URL: {url}")
+            with timed("page_load"):
+                wait = self.timeout if timeout is None else min(self.timeout, timeout)
+                if not slot.acquire(timeout=max(0, wait)):
+                    raise TimeoutError(f"{self.per_host} fetches from {host} already in flight")
+                try:
+                    attempt_timeout = self.timeout
+                    if timeout is not None:
+                        left = timeout - (time.monotonic() - started)
+                        attempt_timeout = min(
+                            self.timeout, max(0.01, left - RETRY_SLEEP) / (RETRIES + 1)
+                        )
+                    response = self.session.get(url, timeout=attempt_timeout)
+                finally:
+                    slot.release()
+            if response.status_code == 404:
+                raise EventNotFound(f"{url} returned 404")
+            response.raise_for_status()
+
+            with timed("html_parse"):
+                event = parse_event_html(response.text, url)
+            if not event.slot_times:
+                # Deleted and mistyped events still load, just without any slot data
+                raise EventNotFound(f"No time slots found on {url}")
+
+            logging.info(
+                f"Extracted {len(event.people_ids)} people and "
+                f"{len(event.slot_times)} time slots (timezone: {event.timezone})"
+            )
+            return event
+        except EventNotFound:
+            raise
+        except Exception as e:
+            logging.error(f"An error occurred: {str(e)}")
+            logging.error(f"Traceback: {traceback.format_exc()}")
+            return None
+
+    def close(self):
+        self.session.close()
+
+
+def make_extractor(backend="http", **options):
+    """Create the extractor for `backend`, passing `options` to its constructor."""
+    if backend == "http":
+        return HttpExtractor(**options)
+    if backend == "selenium":
+        from w2m.browser import SeleniumExtractor
+
+        return SeleniumExtractor(**options)
+    raise ValueError(f"Unknown extractor backend: {backend}")
+
+
+def fetch_event(url, extractor, timeout=None):
+    """Return the EventSnapshot at `url`, or None if the page could not be read.
+
+    Raises EventNotFound when the link is not a live When2Meet event. `timeout`
+    caps how many seconds the extractor may wait, below its own settings.
+    """
+    try:
+        check_event_url(url)
+        event = extractor.extract(url, timeout=timeout)
+    except EventNotFound as e:
+        logging.info(f"No event found: {str(e)}")
+        EVENTS_NOT_FOUND.inc()
+        raise
+    if event is None:
+        SCRAPE_FAILURES.labels(extractor.name).inc()
+    return event
@@ -0,0 +1,166 @@
+"""Fuzzy matching of roster names against an event's participants."""
+import math
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from fractions import Fraction
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+
+def normalize_name(name):
+    return " ".join(name.casefold().split())
+
+
+class NameMatcher:
+    """Fuzzy matches roster names against a fixed list of When2Meet participants.
+
+    Participant keys are normalized and indexed once. Each lookup tries exact and
+    normalized matches first, then scores only participants whose name length can
+    still reach the threshold, in one rapidfuzz call.
+    """
+
+    def __init__(self, participant_names, threshold=90):
+        self.participants = list(participant_names)
+        self.threshold = threshold
+        keys = [participant.lower() for participant in self.participants]
+        self._exact = {}
+        self._normalized = {}
+        for index, key in enumerate(keys):
+            self._exact.setdefault(key, index)
+            self._normalized.setdefault(normalize_name(key), index)
+
+        self._order = sorted(range(len(keys)), key=lambda index: len(keys[index]))
+        self._keys = [keys[index] for index in self._order]
+        self._lengths = [len(key) for key in self._keys]
+        # Ratios are rounded like fuzzywuzzy's, so e.g. 89.5 still reaches 90
+        self._cutoff = max(Fraction(threshold) - Fraction(1, 2), Fraction(0))
+
+    def _length_range(self, key):
+        # ratio = 2 * matches / (len_a + len_b), so the cutoff bounds the other length
+        if self._cutoff <= 0:
+            return 0, len(self._keys)
+        cutoff = self._cutoff / 100
+        shortest = math.ceil(len(key) * cutoff / (2 - cutoff))
+        longest = math.floor(len(key) * (2 - cutoff) / cutoff)
+        return bisect_left(self._lengths, shortest), bisect_right(self._lengths, longest)
+
+    def match(self, name):
+        key = name.lower()
+        index = self._exact.get(key)
+        if index is None:
+            index = self._normalized.get(normalize_name(key))
+        if index is not None:
+            return self.participants[index]
+
+        start, stop = self._length_range(key)
+        scored = process.extract(
+            key,
+            self._keys[start:stop],
+            scorer=fuzz.ratio,
+            score_cutoff=float(self._cutoff),
+            limit=None,
+        )
+        if not scored:
+            return None
+
+        # Ties on the rounded ratio go to the participant listed first
+        _, score, position = max(
+            scored, key=lambda item: (round(item[1]), -self._order[start + item[2]])
+        )
+        if not round(score) or round(score) < self.threshold:
+            return None
+        return self.participants[self._order[start + position]]
+
+
+def assign_names(names_list, participant_names, threshold=90, ambiguity_margin=5):
+    """Match roster names to participants one-to-one, maximizing total similarity.
+
+    Returns one dict per roster name with its match and score, plus the closest
+    other participant when it scored within ambiguity_margin of the match (or
+    when the name went unmatched because its best candidate was taken).
+    """
+    details = [
+        {"name": name, "match": None, "score": None, "runner_up": None, "runner_up_score": None}
+        for name in names_list
+    ]
+    if not names_list or not participant_names:
+        return details
+
+    # SciPy takes a third of a second to import; only one-to-one matching needs it
+    from scipy.optimize import linear_sum_assignment
+
+    keys = [participant.lower() for participant in participant_names]
+    scores = np.round(process.cdist(
+        [name.lower() for name in names_list], keys, scorer=fuzz.ratio, dtype=np.float32
+    ))
+
+    # Names equal after normalizing whitespace and case are paired up front, so the
+    # solver can't trade an exact match for two near misses
+    normalized = defaultdict(list)
+    for col, key in enumerate(keys):
+        normalized[normalize_name(key)].append(col)
+    assigned = np.full(len(names_list), -1)
+    for row, name in enumerate(names_list):
+        exact = normalized.get(normalize_name(name))
+        if exact:
+            scores[row, exact] = 100
+            assigned[row] = exact.pop(0)
+
+    eligible = scores >= threshold
+    free_rows = np.flatnonzero(assigned < 0)
+    free_cols = np.setdiff1d(np.arange(len(keys)), assigned[assigned >= 0])
+    weights = np.where(eligible, scores, 0)[np.ix_(free_rows, free_cols)]
+    for row, col in zip(*linear_sum_assignment(weights, maximize=True)):
+        if weights[row, col]:
+            assigned[free_rows[row]] = free_cols[col]
+
+    for row, detail in enumerate(details):
+        col = assigned[row]
+        others = np.where(eligible[row], scores[row], -1)
+        if col >= 0:
+            detail["match"] = participant_names[col]
+            detail["score"] = int(scores[row, col])
+            others[col] = -1
+        runner_up = int(others.argmax())
+        if others[runner_up] < 0:
+            continue
+        if col < 0 or scores[row, col] - others[runner_up] <= ambiguity_margin:
+            detail["runner_up"] = participant_names[runner_up]
+            detail["runner_up_score"] = int(others[runner_up])
+    return details
+
+
+def find_best_match(name, participant_names, threshold=90):
+    return NameMatcher(participant_names, threshold).match(name)
+
+
+def compare_names(names_list, participant_names, one_to_one=False):
+    """Return (comparison, missing_names, match_details) for a roster.
+
+    match_details is only filled in one-to-one mode, with one entry per roster name.
+    """
+    missing_names = []
+    comparison = []
+    match_details = []
+    if one_to_one:
+        match_details = assign_names(names_list, participant_names)
+        matches = [detail["match"] for detail in match_details]
+    else:
+        matcher = NameMatcher(participant_names)
+        matches = [matcher.match(name) for name in names_list]
+
+    for name, best_match in zip(names_list, matches):
+        if best_match:
+            comparison.append((name, best_match))
+        else:
+            comparison.append((name, ""))
+            missing_names.append(name)
+
+    # Add any remaining When2Meet names
+    matched = {match for _, match in comparison}
+    for w2m_name in participant_names:
+        if w2m_name not in matched:
+            comparison.append(("", w2m_name))
+
+    return comparison, missing_names, match_details
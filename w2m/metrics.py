@@ -0,0 +1,52 @@
+"""Prometheus metrics and per-stage timers shared by the web app and the CLI."""
+import threading
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+
+# Under gunicorn, set PROMETHEUS_MULTIPROC_DIR so /metrics aggregates every worker
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+STAGE_SECONDS = Histogram(
+    "w2m_stage_seconds", "Time spent in each stage of a check.", ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "w2m_request_seconds", "Request latency by endpoint.", ["endpoint", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "w2m_cache_lookups_total", "Event cache lookups by outcome (hit, stale, miss, bypass).",
+    ["result"],
+)
+DRIVER_POOL_WAITS = Counter(
+    "w2m_driver_pool_waits_total", "Browser checkouts that had to wait for a free driver."
+)
+DRIVER_POOL_TIMEOUTS = Counter(
+    "w2m_driver_pool_timeouts_total", "Browser checkouts that gave up waiting."
+)
+SCRAPE_FAILURES = Counter(
+    "w2m_scrape_failures_total", "Event pages that could not be extracted.", ["extractor"]
+)
+EVENTS_NOT_FOUND = Counter(
+    "w2m_events_not_found_total", "Checks of URLs with no live When2Meet event."
+)
+RATE_LIMITED = Counter(
+    "w2m_rate_limited_total", "Requests rejected by the rate limiter.", ["endpoint"]
+)
+
+stage_timings = threading.local()
+
+
+@contextmanager
+def timed(stage):
+    """Record how long the block takes, for /metrics and the slow-request log."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        timings = getattr(stage_timings, "current", None)
+        if timings is not None:
+            timings.append((stage, elapsed))
@@ -0,0 +1,149 @@
+"""Compact binary snapshots (.w2ms) of When2Meet events."""
+import struct
+import zlib
+
+import numpy as np
+
+from w2m.analysis import AvailabilityMatrix
+from w2m.event import EventSnapshot
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+# Binary snapshot layout, little-endian:
+#   "W2MS", version (u8), flags (u8; bit 0 = zlib-compressed body), then the body:
+#   url and timezone (u16 length + UTF-8 each), names (u32 count, then u16 length +
+#   UTF-8 each), people IDs (u32 count + int64s), slot times (u32 count + int64s),
+#   and the availability bitmatrix: one row per slot of ceil(names / 8) bytes,
+#   bit i of a row (little bit order) set when names[i] is available.
+SNAPSHOT_MAGIC = b"W2MS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_COMPRESSED = 0x01
+# Largest body accepted, after decompression; real events are well under 1 MB
+SNAPSHOT_MAX_BODY = 4 * 1024 * 1024
+
+
+def _pack_text(value, length_format):
+    data = value.encode("utf-8")
+    return struct.pack(length_format, len(data)) + data
+
+
+def dump_snapshot(event, compress=True):
+    """Serialize an EventSnapshot into the compact binary snapshot format."""
+    matrix = AvailabilityMatrix(event)
+    parts = [_pack_text(event.url, "<H"), _pack_text(event.timezone, "<H")]
+    parts.append(struct.pack("<I", len(event.people_names)))
+    parts.extend(_pack_text(name, "<H") for name in event.people_names)
+    parts.append(struct.pack("<I", len(event.people_ids)))
+    parts.append(np.asarray(event.people_ids, dtype="<i8").tobytes())
+    parts.append(struct.pack("<I", len(matrix.timestamps)))
+    parts.append(matrix.timestamps.astype("<i8").tobytes())
+    parts.append(np.packbits(matrix.available, axis=1, bitorder="little").tobytes())
+
+    body = b"".join(parts)
+    flags = 0
+    if compress:
+        body = zlib.compress(body)
+        flags |= SNAPSHOT_COMPRESSED
+    return SNAPSHOT_MAGIC + struct.pack("<BB", SNAPSHOT_VERSION, flags) + body
+
+
+def _inflate(body):
+    # Bounded, since snapshots can be uploaded: a small zlib stream can inflate to gigabytes
+    inflater = zlib.decompressobj()
+    inflated = inflater.decompress(body, SNAPSHOT_MAX_BODY + 1)
+    if len(inflated) > SNAPSHOT_MAX_BODY or inflater.unconsumed_tail:
+        raise SnapshotError(f"Snapshot is larger than {SNAPSHOT_MAX_BODY} bytes")
+    if not inflater.eof:
+        raise SnapshotError("Corrupt snapshot: truncated data")
+    if inflater.unused_data:
+        raise SnapshotError("Corrupt snapshot: trailing data")
+    return memoryview(inflated)
+
+
+def load_snapshot(data):
+    """Load a binary snapshot back into an EventSnapshot.
+
+    Arrays are read straight from the buffer and the availability matrix is
+    kept on the snapshot, so analysis starts without re-mapping people IDs.
+    Raises SnapshotError for anything that is not exactly one well-formed
+    snapshot, including bodies over SNAPSHOT_MAX_BODY.
+    """
+    data = memoryview(data)
+    if bytes(data[:4]) != SNAPSHOT_MAGIC or len(data) < 6:
+        raise SnapshotError("Not a When2Meet snapshot")
+    version, flags = struct.unpack_from("<BB", data, 4)
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    body = data[6:]
+    if flags & SNAPSHOT_COMPRESSED:
+        try:
+            body = _inflate(body)
+        except zlib.error as e:
+            raise SnapshotError(f"Corrupt snapshot: {str(e)}")
+    elif len(body) > SNAPSHOT_MAX_BODY:
+        raise SnapshotError(f"Snapshot is larger than {SNAPSHOT_MAX_BODY} bytes")
+
+    try:
+
+        offset = 0
+
+        def read(fmt):
+            nonlocal offset
+            values = struct.unpack_from(fmt, body, offset)
+            offset += struct.calcsize(fmt)
+            return values[0]
+
+        def read_text(length_format):
+            nonlocal offset
+            length = read(length_format)
+            text = bytes(body[offset:offset + length]).decode("utf-8")
+            offset += length
+            return text
+
+        def read_array(count, dtype, itemsize):
+            nonlocal offset
+            array = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+            offset += count * itemsize
+            return array
+
+        url = read_text("<H")
+        timezone = read_text("<H")
+        names = [read_text("<H") for _ in range(read("<I"))]
+        id_count = read("<I")
+        ids = read_array(id_count, "<i8", 8)
+        slot_count = read("<I")
+        # The counts fix the size of everything that follows
+        width = (len(names) + 7) // 8
+        expected = offset + slot_count * 8 + slot_count * width
+        if expected != len(body):
+            raise SnapshotError(
+                f"Corrupt snapshot: expected {expected} bytes for {len(names)} people and "
+                f"{slot_count} slots, found {len(body)}"
+            )
+        timestamps = read_array(slot_count, "<i8", 8)
+        packed = read_array(slot_count * width, np.uint8, 1).reshape(slot_count, width)
+    except (struct.error, ValueError) as e:
+        if isinstance(e, SnapshotError):
+            raise
+        raise SnapshotError(f"Corrupt snapshot: {str(e)}")
+
+    available = np.unpackbits(packed, axis=1, count=len(names), bitorder="little").astype(bool)
+    # The per-slot ID lists are still what diffing and participant lookups use
+    columns = ids[:len(names)]
+    rows, cols = np.nonzero(available[:, :len(columns)])
+    flat = columns[cols].tolist()
+    bounds = np.searchsorted(rows, np.arange(slot_count + 1)).tolist()
+    available_at_slot = [flat[bounds[i]:bounds[i + 1]] for i in range(slot_count)]
+
+    return EventSnapshot(
+        url=url,
+        people_names=names,
+        people_ids=ids.tolist(),
+        slot_times=timestamps.tolist(),
+        available_at_slot=available_at_slot,
+        timezone=timezone,
+        availability=available,
+    )